@@ -0,0 +1,49 @@
+"""
+Import-time benchmark for inspectomop.
+
+Runs `import inspectomop` in fresh interpreters and reports the median wall time together with
+any heavy optional modules that were imported as a side effect.
+
+Usage::
+
+    python benchmarks/bench_import.py [--repeat 10]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ['pandas', 'numpy', 'pyarrow', 'sqlalchemy.ext.automap', 'inspectomop.queries.general']
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import inspectomop
+elapsed = time.perf_counter() - start
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed, ','.join(loaded))
+""".format(heavy=HEAVY_MODULES)
+
+
+def run_once():
+    output = subprocess.run([sys.executable, '-c', SCRIPT], check=True, capture_output=True, text=True).stdout
+    elapsed, loaded = output.strip().partition(' ')[::2]
+    return float(elapsed), [name for name in loaded.split(',') if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    timings, loaded = [], []
+    for _ in range(args.repeat):
+        elapsed, loaded = run_once()
+        timings.append(elapsed)
+    print('import inspectomop: median {:.1f} ms, min {:.1f} ms over {} runs'.format(
+        statistics.median(timings) * 1000, min(timings) * 1000, args.repeat))
+    print('heavy modules imported: {}'.format(', '.join(loaded) or 'none'))
+
+
+if __name__ == '__main__':
+    main()
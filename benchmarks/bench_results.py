@@ -0,0 +1,73 @@
+"""
+Results wrapper overhead micro-benchmark.
+
+Compares row iteration throughput of inspectomop.Results with a raw sqlalchemy CursorResult for
+fetchone loops, small fetchmany batches and plain iteration over an in-memory SQLite table.
+
+Usage::
+
+    python benchmarks/bench_results.py [--rows 200000] [--repeat 5]
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import create_engine, text
+
+from inspectomop.connection import Connection
+
+
+def fetchone_loop(result):
+    n_rows = 0
+    while result.fetchone() is not None:
+        n_rows += 1
+    return n_rows
+
+
+def fetchmany_loop(result):
+    n_rows = 0
+    while True:
+        rows = result.fetchmany(10)
+        if not rows:
+            return n_rows
+        n_rows += len(rows)
+
+
+def iterate(result):
+    return sum(1 for _ in result)
+
+
+def time_consumer(engine, consumer, wrap, repeat):
+    samples = []
+    for _ in range(repeat):
+        with Connection(engine) as connection:
+            start = time.perf_counter()
+            # a raw CursorResult comes from sqlalchemy's own Connection.execute
+            result = connection.execute(text('SELECT * FROM numbers')) if wrap else \
+                super(Connection, connection).execute(text('SELECT * FROM numbers'))
+            n_rows = consumer(result)
+            samples.append(time.perf_counter() - start)
+    return n_rows / statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    with engine.begin() as connection:
+        connection.execute(text('CREATE TABLE numbers (n INTEGER, label TEXT)'))
+        connection.execute(text("WITH RECURSIVE r(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM r WHERE i < :rows) "
+                                "INSERT INTO numbers SELECT i, 'row ' || i FROM r"), {'rows': args.rows})
+
+    print('{:<16} {:>16} {:>16} {:>9}'.format('consumer', 'CursorResult r/s', 'Results r/s', 'overhead'))
+    for consumer in (fetchone_loop, fetchmany_loop, iterate):
+        raw = time_consumer(engine, consumer, False, args.repeat)
+        wrapped = time_consumer(engine, consumer, True, args.repeat)
+        print('{:<16} {:>16,.0f} {:>16,.0f} {:>8.1f}%'.format(consumer.__name__, raw, wrapped, (raw / wrapped - 1) * 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+SQLite connection profile benchmark.
+
+Builds a scaled-up copy of the bundled tiny_omop_test.sqlite3 by replicating the clinical event tables and
+times a few analytic queries with the default connection settings and with profile='sqlite-analytics'.
+
+Usage::
+
+    python benchmarks/bench_sqlite_profile.py [--scale 500] [--repeat 5] [--db /tmp/omop_scaled.sqlite3]
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from inspectomop import Inspector
+from inspectomop.test import test_connection_url
+
+SCALED_TABLES = ['condition_occurrence', 'drug_exposure', 'procedure_occurrence', 'measurement', 'observation',
+                 'visit_occurrence']
+
+QUERIES = {
+    'conditions per concept': 'SELECT condition_concept_id, COUNT(*) FROM condition_occurrence '
+                              'GROUP BY condition_concept_id ORDER BY 2 DESC',
+    'events per person': 'SELECT p.person_id, COUNT(*) FROM person p '
+                         'JOIN procedure_occurrence po ON po.person_id = p.person_id '
+                         'JOIN drug_exposure de ON de.person_id = p.person_id AND de.drug_exposure_id % 50 = 0 '
+                         'GROUP BY p.person_id',
+    'distinct drugs': 'SELECT COUNT(DISTINCT drug_concept_id || \'-\' || drug_exposure_start_date) FROM drug_exposure',
+    'named conditions': 'SELECT c.concept_name, COUNT(*) FROM condition_occurrence co '
+                        'JOIN concept c ON c.concept_id = co.condition_concept_id '
+                        'GROUP BY c.concept_name ORDER BY 2 DESC LIMIT 20',
+}
+
+
+def build_database(db_file, scale):
+    shutil.copy(test_connection_url().replace('sqlite:///', ''), db_file)
+    with sqlite3.connect(db_file) as connection:
+        for table in SCALED_TABLES:
+            connection.execute('CREATE TEMP TABLE seed AS SELECT * FROM {}'.format(table))
+            connection.executemany('INSERT INTO {} SELECT * FROM seed'.format(table), [()] * (scale - 1))
+            connection.execute('DROP TABLE seed')
+    with sqlite3.connect(db_file) as connection:
+        connection.execute('VACUUM')
+
+
+def time_queries(inspector, repeat):
+    timings = {}
+    for name, sql in QUERIES.items():
+        samples = []
+        for _ in range(repeat):
+            # a fresh connection for every run so that the page cache of a previous run is not reused
+            inspector.engine.dispose()
+            start = time.perf_counter()
+            with inspector.engine.connect() as connection:
+                connection.execute(text(sql)).fetchall()
+            samples.append(time.perf_counter() - start)
+        timings[name] = statistics.median(samples)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', type=int, default=500, help='number of copies of each clinical event table')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--db', help='path of the scaled database, built in a temporary directory by default')
+    args = parser.parse_args()
+
+    tmp_dir = None
+    db_file = args.db
+    if db_file is None:
+        tmp_dir = tempfile.mkdtemp()
+        db_file = os.path.join(tmp_dir, 'omop_scaled.sqlite3')
+    try:
+        if not os.path.exists(db_file):
+            build_database(db_file, args.scale)
+        print('database: {} ({:.1f} MiB)'.format(db_file, os.path.getsize(db_file) / 2 ** 20))
+
+        default = time_queries(Inspector('sqlite:///' + db_file), args.repeat)
+        profiled = time_queries(Inspector('sqlite:///' + db_file, profile='sqlite-analytics'), args.repeat)
+        print('{:<24} {:>12} {:>18} {:>8}'.format('query', 'default ms', 'sqlite-analytics ms', 'speedup'))
+        for name in QUERIES:
+            print('{:<24} {:>12.1f} {:>18.1f} {:>7.2f}x'.format(
+                name, default[name] * 1000, profiled[name] * 1000, default[name] / profiled[name]))
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Statement reuse benchmark.
+
+Times query functions called with changing arguments, the pattern of an API serving many small lookups,
+with statements rebuilt on every call (the undecorated query function) and with statements reused from
+Inspector.statement_cache.  Reports the time spent preparing the statement and the end to end query rate
+against the bundled tiny_omop_test.sqlite3.
+
+Usage::
+
+    python benchmarks/bench_statements.py [--calls 2000] [--repeat 5]
+"""
+import argparse
+import itertools
+import statistics
+import time
+
+from inspectomop import Inspector
+from inspectomop.queries import condition, general
+from inspectomop.test import test_connection_url
+
+CONCEPT_IDS = [73553, 27674, 9202, 4342637, 73840]
+QUERIES = [
+    (general.siblings_for_concept_id, CONCEPT_IDS),
+    (general.related_concepts_for_concept_id, CONCEPT_IDS),
+    (general.descendants_for_concept_id, CONCEPT_IDS),
+    (condition.source_codes_for_concept_ids, [CONCEPT_IDS[:n] for n in range(1, 6)]),
+    (condition.anatomical_site_by_keyword, ['joint', 'knee', 'heart', 'lung', 'skin']),
+]
+
+
+def time_calls(build, arguments, calls, repeat, connection=None):
+    samples = []
+    for _ in range(repeat):
+        values = itertools.islice(itertools.cycle(arguments), calls)
+        start = time.perf_counter()
+        for value in values:
+            statement = build(value)
+            # the SQLAlchemy cache key is part of the compile step of every execution
+            if connection is None:
+                statement._generate_cache_key()
+            else:
+                connection.execute(statement).fetchall()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    inspector = Inspector(test_connection_url())
+    print('{:<32} {:>11} {:>11} {:>8} {:>11} {:>11} {:>8}'.format(
+        'query', 'rebuild us', 'reuse us', 'speedup', 'rebuild q/s', 'reuse q/s', 'speedup'))
+    with inspector.connect() as connection:
+        for query, arguments in QUERIES:
+            rebuild = lambda value: query.__wrapped__(value, inspector)
+            reuse = lambda value: query(value, inspector)
+            prepare = [time_calls(build, arguments, args.calls, args.repeat) for build in (rebuild, reuse)]
+            execute = [time_calls(build, arguments, args.calls // 10, args.repeat, connection) for build in (rebuild, reuse)]
+            print('{:<32} {:>11.1f} {:>11.1f} {:>7.1f}x {:>11,.0f} {:>11,.0f} {:>7.2f}x'.format(
+                query.__name__[:32], prepare[0] * 1e6, prepare[1] * 1e6, prepare[0] / prepare[1],
+                1 / execute[0], 1 / execute[1], execute[0] / execute[1]))
+
+
+if __name__ == '__main__':
+    main()
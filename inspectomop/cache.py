@@ -0,0 +1,520 @@
+"""
+Caching helpers used by the Inspector.
+"""
+from collections import OrderedDict as _OrderedDict, namedtuple as _namedtuple
+from collections.abc import Iterable as _Iterable
+import functools as _functools
+import hashlib as _hashlib
+import inspect as _pyinspect
+import os as _os
+import pickle as _pickle
+import tempfile as _tempfile
+import threading as _threading
+import time as _time
+
+import sqlalchemy as _sqlalchemy
+from sqlalchemy import inspect as _inspect, text as _text, bindparam as _bindparam
+from sqlalchemy.exc import DBAPIError as _DBAPIError
+
+
+def schema_fingerprint(engine, schema=None):
+    """
+    Returns a cheap fingerprint of the table structure in a database schema.
+
+    The fingerprint changes whenever tables or columns are added, removed or altered and can be compared
+    across processes to decide whether previously reflected table definitions are still valid.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+    schema : str, optional
+        schema to fingerprint, defaults to the default schema of the connection
+
+    Returns
+    -------
+    fingerprint : str
+
+    Notes
+    -----
+    SQLite databases use ``PRAGMA schema_version``, which SQLite increments on every schema change.
+    Other dialects hash the rows of ``information_schema.columns`` for the schema and fall back to
+    hashing the table names returned by the dialect when ``information_schema`` is unavailable.
+    """
+    if engine.dialect.name == 'sqlite':
+        with engine.connect() as connection:
+            # include the file backing the schema so that re-attaching a different file under the same name is detected
+            db_files = {name: file for _, name, file in connection.exec_driver_sql('PRAGMA database_list')}
+            pragma = 'PRAGMA "{}".schema_version'.format(schema) if schema else 'PRAGMA schema_version'
+            version = connection.exec_driver_sql(pragma).scalar()
+        return 'sqlite:{}:{}'.format(db_files.get(schema or 'main'), version)
+
+    digest = _hashlib.sha256()
+    for table_name, fingerprint in sorted(table_fingerprints(engine, schema).items()):
+        digest.update('{}|{}\n'.format(table_name, fingerprint).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def table_fingerprints(engine, schema=None, table_names=None):
+    """
+    Returns a fingerprint for each table in a database schema.
+
+    Used together with `schema_fingerprint` to find the tables that changed once the schema fingerprint differs.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+    schema : str, optional
+        schema to fingerprint, defaults to the default schema of the connection
+    table_names : list of str, optional
+        only fingerprint these tables, by default all tables in the schema
+
+    Returns
+    -------
+    fingerprints : dict
+        table name -> fingerprint.  The fingerprint is None if it could not be determined, in which
+        case the table should be treated as changed.  Tables that do not exist are left out.
+
+    Notes
+    -----
+    SQLite databases hash the ``CREATE TABLE`` statements stored in ``sqlite_master``.
+    Other dialects hash the rows of ``information_schema.columns`` for each table.
+    """
+    if table_names is not None:
+        table_names = list(table_names)
+        if not table_names:
+            return {}
+    digests = {}
+    with engine.connect() as connection:
+        if engine.dialect.name == 'sqlite':
+            master = '"{}".sqlite_master'.format(schema) if schema else 'sqlite_master'
+            rows = connection.exec_driver_sql("SELECT name, sql FROM {} WHERE type = 'table'".format(master))
+            return {table_name: _hashlib.sha256((sql or '').encode('utf-8')).hexdigest() for table_name, sql in rows
+                    if table_names is None or table_name in table_names}
+
+        schema_name = schema or _inspect(connection).default_schema_name
+        statement = 'SELECT table_name, column_name, data_type, is_nullable ' \
+            'FROM information_schema.columns WHERE table_schema = :schema '
+        parameters = {'schema': schema_name}
+        if table_names is not None:
+            statement += 'AND table_name IN :table_names '
+            parameters['table_names'] = table_names
+        statement = _text(statement + 'ORDER BY table_name, column_name')
+        if table_names is not None:
+            statement = statement.bindparams(_bindparam('table_names', expanding=True))
+        try:
+            for row in connection.execute(statement, parameters):
+                digest = digests.setdefault(row[0], _hashlib.sha256())
+                digest.update('|'.join(str(value) for value in row[1:]).encode('utf-8'))
+                digest.update(b'\n')
+        except _DBAPIError:
+            connection.rollback()
+            return {table_name: None for table_name in _inspect(connection).get_table_names(schema=schema)
+                    if table_names is None or table_name in table_names}
+    return {table_name: digest.hexdigest() for table_name, digest in digests.items()}
+
+
+class ReflectionCache():
+    """
+    An on-disk cache of reflected sqlalchemy.MetaData objects.
+
+    Entries are keyed by connection URL, dialect and schema and are stored together with a schema fingerprint.
+    An entry is only returned if the fingerprint it was stored with matches the current one.
+
+    Parameters
+    ----------
+    cache_dir : str
+        directory used to store cache files.  Created if it does not exist.
+
+    Warnings
+    --------
+    Cache files are Python pickles.  Only point `cache_dir` at a directory that you trust.
+
+    See Also
+    --------
+    schema_fingerprint
+    """
+
+    def __init__(self, cache_dir):
+        self.__cache_dir = _os.path.abspath(_os.path.expanduser(cache_dir))
+        _os.makedirs(self.__cache_dir, exist_ok=True)
+
+    @property
+    def cache_dir(self):
+        """
+        The directory holding the cache files.
+        """
+        return self.__cache_dir
+
+    def _path(self, engine, schema):
+        url = engine.url.render_as_string(hide_password=True)
+        key = '|'.join([url, engine.dialect.name, schema or ''])
+        return _os.path.join(self.__cache_dir, _hashlib.sha256(key.encode('utf-8')).hexdigest() + '.pickle')
+
+    def load(self, engine, schema, fingerprint):
+        """
+        Returns the cached MetaData for `schema` or None if there is no valid entry.
+
+        Parameters
+        ----------
+        engine : sqlalchemy.engine.Engine
+        schema : str or None
+        fingerprint : str
+            the current schema fingerprint, see `schema_fingerprint`
+
+        Returns
+        -------
+        metadata : sqlalchemy.MetaData or None
+        """
+        path = self._path(engine, schema)
+        if not _os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as fh:
+                entry = _pickle.load(fh)
+        except Exception:
+            return None
+        if entry.get('sqlalchemy_version') != _sqlalchemy.__version__ or entry.get('fingerprint') != fingerprint:
+            return None
+        metadata = entry['metadata']
+        # MetaData.info is not pickled with the MetaData itself
+        metadata.info.update(entry.get('info', {}))
+        return metadata
+
+    def save(self, engine, schema, fingerprint, metadata):
+        """
+        Stores `metadata` for `schema` together with its fingerprint.
+
+        Parameters
+        ----------
+        engine : sqlalchemy.engine.Engine
+        schema : str or None
+        fingerprint : str
+        metadata : sqlalchemy.MetaData
+        """
+        path = self._path(engine, schema)
+        entry = {'sqlalchemy_version': _sqlalchemy.__version__, 'fingerprint': fingerprint, 'metadata': metadata,
+                 'info': dict(metadata.info)}
+        # write to a temporary file first so concurrent readers never see a partially written cache file
+        fd, tmp_path = _tempfile.mkstemp(dir=self.__cache_dir, suffix='.tmp')
+        try:
+            with _os.fdopen(fd, 'wb') as fh:
+                _pickle.dump(entry, fh, protocol=_pickle.HIGHEST_PROTOCOL)
+            _os.replace(tmp_path, path)
+        except BaseException:
+            if _os.path.exists(tmp_path):
+                _os.remove(tmp_path)
+            raise
+
+    def clear(self):
+        """
+        Removes all cache files from `cache_dir`.
+        """
+        for file_name in _os.listdir(self.__cache_dir):
+            if file_name.endswith('.pickle'):
+                _os.remove(_os.path.join(self.__cache_dir, file_name))
+
+
+CacheInfo = _namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class ConceptCache():
+    """
+    An in-memory LRU cache of concept and concept synonym rows with optional time-to-live.
+
+    Lookups return cached rows directly and fetch all ids that are not cached (or whose entry expired)
+    in a single query.  Ids that are not found in the database are cached as well.
+
+    Parameters
+    ----------
+    inspector : inspectomop.inspector.Inspector
+    maxsize : int, default 100000
+        maximum number of cached entries, the least recently used entries are evicted first.
+        Concepts and the synonyms of a concept are separate entries.
+    ttl : float, optional
+        number of seconds after which an entry expires.  By default entries never expire.
+
+    See Also
+    --------
+    inspectomop.queries.general.concepts_for_concept_ids
+    inspectomop.queries.general.synonyms_for_concept_ids
+
+    Examples
+    --------
+    >>> inspector = Inspector(connection_url, concept_cache_size=50000, concept_cache_ttl=3600)
+    >>> rows = inspector.concept_cache.concepts([192671, 201826])
+    >>> inspector.concept_cache.info()
+    CacheInfo(hits=0, misses=2, maxsize=50000, currsize=2)
+    """
+
+    def __init__(self, inspector, maxsize=100000, ttl=None):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        if ttl is not None and ttl <= 0:
+            raise ValueError('ttl must be a positive number of seconds')
+        self.__inspector = inspector
+        self.__maxsize = maxsize
+        self.__ttl = ttl
+        self.__entries = _OrderedDict() # (kind, concept_id) -> (expires, value)
+        self.__lock = _threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def maxsize(self):
+        """
+        The maximum number of cached entries.
+        """
+        return self.__maxsize
+
+    @property
+    def ttl(self):
+        """
+        The number of seconds after which an entry expires or None if entries never expire.
+        """
+        return self.__ttl
+
+    @property
+    def hits(self):
+        """
+        The number of ids served from the cache.
+        """
+        return self.__hits
+
+    @property
+    def misses(self):
+        """
+        The number of ids that had to be fetched from the database.
+        """
+        return self.__misses
+
+    def info(self):
+        """
+        Returns the cache statistics.
+
+        Returns
+        -------
+        info : CacheInfo
+            namedtuple of (hits, misses, maxsize, currsize) like functools.lru_cache.cache_info
+        """
+        with self.__lock:
+            return CacheInfo(self.__hits, self.__misses, self.__maxsize, len(self.__entries))
+
+    def clear(self):
+        """
+        Removes all entries and resets the hit and miss counters.
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__hits = self.__misses = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def _get(self, kind, concept_ids):
+        # returns the cached values and the ids that have to be fetched
+        found, missing = {}, []
+        now = _time.monotonic()
+        with self.__lock:
+            for concept_id in concept_ids:
+                key = (kind, concept_id)
+                entry = self.__entries.get(key)
+                if entry is not None and (entry[0] is None or entry[0] > now):
+                    self.__entries.move_to_end(key)
+                    found[concept_id] = entry[1]
+                else:
+                    missing.append(concept_id)
+            self.__hits += len(found)
+            self.__misses += len(missing)
+        return found, missing
+
+    def _put(self, kind, values):
+        expires = None if self.__ttl is None else _time.monotonic() + self.__ttl
+        with self.__lock:
+            for concept_id, value in values.items():
+                key = (kind, concept_id)
+                self.__entries[key] = (expires, value)
+                self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__maxsize:
+                self.__entries.popitem(last=False)
+
+    def _lookup(self, kind, concept_ids, query, connection):
+        concept_ids = list(dict.fromkeys(concept_ids)) # unique, in the order given
+        found, missing = self._get(kind, concept_ids)
+        if missing:
+            fetched = {concept_id: [] for concept_id in missing}
+            if connection is None:
+                with self.__inspector.connect() as connection:
+                    rows = connection.execute(query(missing, self.__inspector)).fetchall()
+            else:
+                rows = connection.execute(query(missing, self.__inspector)).fetchall()
+            for row in rows:
+                fetched[row.concept_id].append(row)
+            if kind == 'concept':
+                fetched = {concept_id: rows[0] if rows else None for concept_id, rows in fetched.items()}
+            self._put(kind, fetched)
+            found.update(fetched)
+        return {concept_id: found[concept_id] for concept_id in concept_ids}
+
+    def concepts(self, concept_ids, connection=None):
+        """
+        Returns the concept rows of concept_ids, fetching the ones that are not cached in a single query.
+
+        Parameters
+        ----------
+        concept_ids : iterable of int
+        connection : inspectomop.connection.Connection, optional
+            connection used to fetch missing ids, by default a new connection is opened when needed
+
+        Returns
+        -------
+        concepts : list of sqlalchemy.engine.Row
+            rows with the columns of inspectomop.queries.general.concepts_for_concept_ids in the order of
+            `concept_ids`.  Duplicate ids are returned once and ids that do not exist are left out.
+        """
+        from .queries.general import concepts_for_concept_ids
+        rows = self._lookup('concept', concept_ids, concepts_for_concept_ids, connection)
+        return [row for row in rows.values() if row is not None]
+
+    def synonyms(self, concept_ids, connection=None):
+        """
+        Returns the synonym rows of concept_ids, fetching the ones that are not cached in a single query.
+
+        Parameters
+        ----------
+        concept_ids : iterable of int
+        connection : inspectomop.connection.Connection, optional
+            connection used to fetch missing ids, by default a new connection is opened when needed
+
+        Returns
+        -------
+        synonyms : list of sqlalchemy.engine.Row
+            rows with the columns of inspectomop.queries.general.synonyms_for_concept_ids grouped by concept_id
+            in the order of `concept_ids`
+        """
+        from .queries.general import synonyms_for_concept_ids
+        rows = self._lookup('synonyms', concept_ids, synonyms_for_concept_ids, connection)
+        return [row for concept_rows in rows.values() for row in concept_rows]
+
+
+class StatementCache():
+    """
+    An in-memory LRU cache of the statements built by query functions.
+
+    Query functions decorated with `cached_statement` build their statement once per Inspector with named bind
+    parameters and return a copy with the new parameter values (Executable.params) on later calls.  This skips building the
+    statement and keeps its structure, and so its SQLAlchemy compiled cache entry and server side prepared
+    plans, identical across calls.
+
+    Parameters
+    ----------
+    maxsize : int, default 1024
+        maximum number of cached statements, the least recently used statements are evicted first.
+    """
+
+    def __init__(self, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.__maxsize = maxsize
+        self.__statements = _OrderedDict()
+        self.__lock = _threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get(self, key):
+        """
+        Returns the statement cached under `key` or None.
+        """
+        with self.__lock:
+            statement = self.__statements.get(key)
+            if statement is None:
+                self.__misses += 1
+            else:
+                self.__statements.move_to_end(key)
+                self.__hits += 1
+            return statement
+
+    def put(self, key, statement):
+        """
+        Caches `statement` under `key`.
+        """
+        with self.__lock:
+            self.__statements[key] = statement
+            self.__statements.move_to_end(key)
+            while len(self.__statements) > self.__maxsize:
+                self.__statements.popitem(last=False)
+
+    def info(self):
+        """
+        Returns the cache statistics.
+
+        Returns
+        -------
+        info : CacheInfo
+            namedtuple of (hits, misses, maxsize, currsize) like functools.lru_cache.cache_info
+        """
+        with self.__lock:
+            return CacheInfo(self.__hits, self.__misses, self.__maxsize, len(self.__statements))
+
+    def clear(self):
+        """
+        Removes all statements and resets the hit and miss counters.
+        """
+        with self.__lock:
+            self.__statements.clear()
+            self.__hits = self.__misses = 0
+
+    def __len__(self):
+        return len(self.__statements)
+
+
+def _bind_value(value):
+    # iterables are bound to expanding parameters, which take lists
+    if isinstance(value, (str, bytes)) or not isinstance(value, _Iterable):
+        return value
+    return list(value)
+
+
+def cached_statement(variant=None, params=None):
+    """
+    Decorator caching the statement built by a query function in Inspector.statement_cache.
+
+    The query function must take `inspector` and optionally `return_columns` arguments and bind each other
+    argument with a bind parameter of the same name, e.g. ``sqlalchemy.bindparam('concept_id', concept_id)``
+    or ``sqlalchemy.bindparam('concept_ids', concept_ids, expanding=True)`` for lists.
+    The first call builds the statement and every call, the first included, returns a copy of it with its own
+    values from `sqlalchemy.sql.expression.Executable.params`, so the SQL and the compiled cache key of the
+    returned statements are the same for every call.
+
+    Parameters
+    ----------
+    variant : callable, optional
+        called with the arguments of the query function (including `inspector`) and returning a hashable value
+        that is added to the cache key.  Needed when the structure of the statement depends on the argument
+        values, e.g. whether an optional list is given.
+    params : callable, optional
+        called with the arguments of the query function (except `inspector` and `return_columns`) and
+        returning the bind parameter values.  By default each argument is bound to the parameter of the same name.
+    """
+    def decorator(query):
+        signature = _pyinspect.signature(query)
+
+        @_functools.wraps(query)
+        def wrapper(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            arguments = {name: _bind_value(value) if name not in ('inspector', 'return_columns') else value
+                         for name, value in arguments.arguments.items()}
+            inspector = arguments.pop('inspector')
+            return_columns = arguments.pop('return_columns', None)
+            key = (query.__module__, query.__qualname__, tuple(return_columns) if return_columns else None,
+                   variant(inspector=inspector, **arguments) if variant is not None else None)
+            statement = inspector.statement_cache.get(key)
+            if statement is None:
+                extra = {'return_columns': return_columns} if 'return_columns' in signature.parameters else {}
+                statement = query(inspector=inspector, **arguments, **extra)
+                inspector.statement_cache.put(key, statement)
+            if not arguments:
+                return statement
+            return statement.params(**(params(**arguments) if params is not None else arguments))
+        return wrapper
+    return decorator
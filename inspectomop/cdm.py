@@ -0,0 +1,755 @@
+"""
+Static OMOP CDM table definitions.
+==================================
+
+Table definitions for the published OMOP CDM DDL.  They can be bound to a database instead of
+reflecting its catalog, see the `reflect` parameter of inspectomop.Inspector.
+
+Adapted from: https://github.com/OHDSI/CommonDataModel
+"""
+
+from sqlalchemy import MetaData as _MetaData, Table as _Table, Column as _Column, \
+    Integer as _Integer, BigInteger as _BigInteger, String as _String, Text as _Text, \
+    Date as _Date, DateTime as _DateTime, Numeric as _Numeric
+
+CDM_VERSIONS = ('5.3', '5.4')
+
+_INT = _Integer
+_BIGINT = _BigInteger
+_DATE = _Date
+_DATETIME = _DateTime
+_NUMERIC = _Numeric
+_TEXT = _Text
+_VARCHAR = _String
+
+# Each column is (name, type, nullable).  The first column of a table is its primary key
+# if the table name appears in _PRIMARY_KEYS.
+
+_SHARED_TABLES = {
+    'person': [
+        ('person_id', _INT, False),
+        ('gender_concept_id', _INT, False),
+        ('year_of_birth', _INT, False),
+        ('month_of_birth', _INT, True),
+        ('day_of_birth', _INT, True),
+        ('birth_datetime', _DATETIME, True),
+        ('race_concept_id', _INT, False),
+        ('ethnicity_concept_id', _INT, False),
+        ('location_id', _INT, True),
+        ('provider_id', _INT, True),
+        ('care_site_id', _INT, True),
+        ('person_source_value', _VARCHAR(50), True),
+        ('gender_source_value', _VARCHAR(50), True),
+        ('gender_source_concept_id', _INT, True),
+        ('race_source_value', _VARCHAR(50), True),
+        ('race_source_concept_id', _INT, True),
+        ('ethnicity_source_value', _VARCHAR(50), True),
+        ('ethnicity_source_concept_id', _INT, True)],
+    'observation_period': [
+        ('observation_period_id', _INT, False),
+        ('person_id', _INT, False),
+        ('observation_period_start_date', _DATE, False),
+        ('observation_period_end_date', _DATE, False),
+        ('period_type_concept_id', _INT, False)],
+    'drug_exposure': [
+        ('drug_exposure_id', _INT, False),
+        ('person_id', _INT, False),
+        ('drug_concept_id', _INT, False),
+        ('drug_exposure_start_date', _DATE, False),
+        ('drug_exposure_start_datetime', _DATETIME, True),
+        ('drug_exposure_end_date', _DATE, False),
+        ('drug_exposure_end_datetime', _DATETIME, True),
+        ('verbatim_end_date', _DATE, True),
+        ('drug_type_concept_id', _INT, False),
+        ('stop_reason', _VARCHAR(20), True),
+        ('refills', _INT, True),
+        ('quantity', _NUMERIC, True),
+        ('days_supply', _INT, True),
+        ('sig', _TEXT, True),
+        ('route_concept_id', _INT, True),
+        ('lot_number', _VARCHAR(50), True),
+        ('provider_id', _INT, True),
+        ('visit_occurrence_id', _INT, True),
+        ('visit_detail_id', _INT, True),
+        ('drug_source_value', _VARCHAR(50), True),
+        ('drug_source_concept_id', _INT, True),
+        ('route_source_value', _VARCHAR(50), True),
+        ('dose_unit_source_value', _VARCHAR(50), True)],
+    'death': [
+        ('person_id', _INT, False),
+        ('death_date', _DATE, False),
+        ('death_datetime', _DATETIME, True),
+        ('death_type_concept_id', _INT, True),
+        ('cause_concept_id', _INT, True),
+        ('cause_source_value', _VARCHAR(50), True),
+        ('cause_source_concept_id', _INT, True)],
+    'note_nlp': [
+        ('note_nlp_id', _INT, False),
+        ('note_id', _INT, False),
+        ('section_concept_id', _INT, True),
+        ('snippet', _VARCHAR(250), True),
+        ('offset', _VARCHAR(50), True),
+        ('lexical_variant', _VARCHAR(250), False),
+        ('note_nlp_concept_id', _INT, True),
+        ('note_nlp_source_concept_id', _INT, True),
+        ('nlp_system', _VARCHAR(250), True),
+        ('nlp_date', _DATE, False),
+        ('nlp_datetime', _DATETIME, True),
+        ('term_exists', _VARCHAR(1), True),
+        ('term_temporal', _VARCHAR(50), True),
+        ('term_modifiers', _VARCHAR(2000), True)],
+    'specimen': [
+        ('specimen_id', _INT, False),
+        ('person_id', _INT, False),
+        ('specimen_concept_id', _INT, False),
+        ('specimen_type_concept_id', _INT, False),
+        ('specimen_date', _DATE, False),
+        ('specimen_datetime', _DATETIME, True),
+        ('quantity', _NUMERIC, True),
+        ('unit_concept_id', _INT, True),
+        ('anatomic_site_concept_id', _INT, True),
+        ('disease_status_concept_id', _INT, True),
+        ('specimen_source_id', _VARCHAR(50), True),
+        ('specimen_source_value', _VARCHAR(50), True),
+        ('unit_source_value', _VARCHAR(50), True),
+        ('anatomic_site_source_value', _VARCHAR(50), True),
+        ('disease_status_source_value', _VARCHAR(50), True)],
+    'fact_relationship': [
+        ('domain_concept_id_1', _INT, False),
+        ('fact_id_1', _INT, False),
+        ('domain_concept_id_2', _INT, False),
+        ('fact_id_2', _INT, False),
+        ('relationship_concept_id', _INT, False)],
+    'care_site': [
+        ('care_site_id', _INT, False),
+        ('care_site_name', _VARCHAR(255), True),
+        ('place_of_service_concept_id', _INT, True),
+        ('location_id', _INT, True),
+        ('care_site_source_value', _VARCHAR(50), True),
+        ('place_of_service_source_value', _VARCHAR(50), True)],
+    'provider': [
+        ('provider_id', _INT, False),
+        ('provider_name', _VARCHAR(255), True),
+        ('npi', _VARCHAR(20), True),
+        ('dea', _VARCHAR(20), True),
+        ('specialty_concept_id', _INT, True),
+        ('care_site_id', _INT, True),
+        ('year_of_birth', _INT, True),
+        ('gender_concept_id', _INT, True),
+        ('provider_source_value', _VARCHAR(50), True),
+        ('specialty_source_value', _VARCHAR(50), True),
+        ('specialty_source_concept_id', _INT, True),
+        ('gender_source_value', _VARCHAR(50), True),
+        ('gender_source_concept_id', _INT, True)],
+    'payer_plan_period': [
+        ('payer_plan_period_id', _INT, False),
+        ('person_id', _INT, False),
+        ('payer_plan_period_start_date', _DATE, False),
+        ('payer_plan_period_end_date', _DATE, False),
+        ('payer_concept_id', _INT, True),
+        ('payer_source_value', _VARCHAR(50), True),
+        ('payer_source_concept_id', _INT, True),
+        ('plan_concept_id', _INT, True),
+        ('plan_source_value', _VARCHAR(50), True),
+        ('plan_source_concept_id', _INT, True),
+        ('sponsor_concept_id', _INT, True),
+        ('sponsor_source_value', _VARCHAR(50), True),
+        ('sponsor_source_concept_id', _INT, True),
+        ('family_source_value', _VARCHAR(50), True),
+        ('stop_reason_concept_id', _INT, True),
+        ('stop_reason_source_value', _VARCHAR(50), True),
+        ('stop_reason_source_concept_id', _INT, True)],
+    'cost': [
+        ('cost_id', _INT, False),
+        ('cost_event_id', _INT, False),
+        ('cost_domain_id', _VARCHAR(20), False),
+        ('cost_type_concept_id', _INT, False),
+        ('currency_concept_id', _INT, True),
+        ('total_charge', _NUMERIC, True),
+        ('total_cost', _NUMERIC, True),
+        ('total_paid', _NUMERIC, True),
+        ('paid_by_payer', _NUMERIC, True),
+        ('paid_by_patient', _NUMERIC, True),
+        ('paid_patient_copay', _NUMERIC, True),
+        ('paid_patient_coinsurance', _NUMERIC, True),
+        ('paid_patient_deductible', _NUMERIC, True),
+        ('paid_by_primary', _NUMERIC, True),
+        ('paid_ingredient_cost', _NUMERIC, True),
+        ('paid_dispensing_fee', _NUMERIC, True),
+        ('payer_plan_period_id', _INT, True),
+        ('amount_allowed', _NUMERIC, True),
+        ('revenue_code_concept_id', _INT, True),
+        ('revenue_code_source_value', _VARCHAR(50), True),
+        ('drg_concept_id', _INT, True),
+        ('drg_source_value', _VARCHAR(3), True)],
+    'drug_era': [
+        ('drug_era_id', _INT, False),
+        ('person_id', _INT, False),
+        ('drug_concept_id', _INT, False),
+        ('drug_era_start_date', _DATE, False),
+        ('drug_era_end_date', _DATE, False),
+        ('drug_exposure_count', _INT, True),
+        ('gap_days', _INT, True)],
+    'dose_era': [
+        ('dose_era_id', _INT, False),
+        ('person_id', _INT, False),
+        ('drug_concept_id', _INT, False),
+        ('unit_concept_id', _INT, False),
+        ('dose_value', _NUMERIC, False),
+        ('dose_era_start_date', _DATE, False),
+        ('dose_era_end_date', _DATE, False)],
+    'condition_era': [
+        ('condition_era_id', _INT, False),
+        ('person_id', _INT, False),
+        ('condition_concept_id', _INT, False),
+        ('condition_era_start_date', _DATE, False),
+        ('condition_era_end_date', _DATE, False),
+        ('condition_occurrence_count', _INT, True)],
+    'cohort': [
+        ('cohort_definition_id', _INT, False),
+        ('subject_id', _INT, False),
+        ('cohort_start_date', _DATE, False),
+        ('cohort_end_date', _DATE, False)],
+    'concept': [
+        ('concept_id', _INT, False),
+        ('concept_name', _VARCHAR(255), False),
+        ('domain_id', _VARCHAR(20), False),
+        ('vocabulary_id', _VARCHAR(20), False),
+        ('concept_class_id', _VARCHAR(20), False),
+        ('standard_concept', _VARCHAR(1), True),
+        ('concept_code', _VARCHAR(50), False),
+        ('valid_start_date', _DATE, False),
+        ('valid_end_date', _DATE, False),
+        ('invalid_reason', _VARCHAR(1), True)],
+    'vocabulary': [
+        ('vocabulary_id', _VARCHAR(20), False),
+        ('vocabulary_name', _VARCHAR(255), False),
+        ('vocabulary_reference', _VARCHAR(255), True),
+        ('vocabulary_version', _VARCHAR(255), True),
+        ('vocabulary_concept_id', _INT, False)],
+    'domain': [
+        ('domain_id', _VARCHAR(20), False),
+        ('domain_name', _VARCHAR(255), False),
+        ('domain_concept_id', _INT, False)],
+    'concept_class': [
+        ('concept_class_id', _VARCHAR(20), False),
+        ('concept_class_name', _VARCHAR(255), False),
+        ('concept_class_concept_id', _INT, False)],
+    'concept_relationship': [
+        ('concept_id_1', _INT, False),
+        ('concept_id_2', _INT, False),
+        ('relationship_id', _VARCHAR(20), False),
+        ('valid_start_date', _DATE, False),
+        ('valid_end_date', _DATE, False),
+        ('invalid_reason', _VARCHAR(1), True)],
+    'relationship': [
+        ('relationship_id', _VARCHAR(20), False),
+        ('relationship_name', _VARCHAR(255), False),
+        ('is_hierarchical', _VARCHAR(1), False),
+        ('defines_ancestry', _VARCHAR(1), False),
+        ('reverse_relationship_id', _VARCHAR(20), False),
+        ('relationship_concept_id', _INT, False)],
+    'concept_synonym': [
+        ('concept_id', _INT, False),
+        ('concept_synonym_name', _VARCHAR(1000), False),
+        ('language_concept_id', _INT, False)],
+    'concept_ancestor': [
+        ('ancestor_concept_id', _INT, False),
+        ('descendant_concept_id', _INT, False),
+        ('min_levels_of_separation', _INT, False),
+        ('max_levels_of_separation', _INT, False)],
+    'source_to_concept_map': [
+        ('source_code', _VARCHAR(50), False),
+        ('source_concept_id', _INT, False),
+        ('source_vocabulary_id', _VARCHAR(20), False),
+        ('source_code_description', _VARCHAR(255), True),
+        ('target_concept_id', _INT, False),
+        ('target_vocabulary_id', _VARCHAR(20), False),
+        ('valid_start_date', _DATE, False),
+        ('valid_end_date', _DATE, False),
+        ('invalid_reason', _VARCHAR(1), True)],
+    'drug_strength': [
+        ('drug_concept_id', _INT, False),
+        ('ingredient_concept_id', _INT, False),
+        ('amount_value', _NUMERIC, True),
+        ('amount_unit_concept_id', _INT, True),
+        ('numerator_value', _NUMERIC, True),
+        ('numerator_unit_concept_id', _INT, True),
+        ('denominator_value', _NUMERIC, True),
+        ('denominator_unit_concept_id', _INT, True),
+        ('box_size', _INT, True),
+        ('valid_start_date', _DATE, False),
+        ('valid_end_date', _DATE, False),
+        ('invalid_reason', _VARCHAR(1), True)],
+    'cohort_definition': [
+        ('cohort_definition_id', _INT, False),
+        ('cohort_definition_name', _VARCHAR(255), False),
+        ('cohort_definition_description', _TEXT, True),
+        ('definition_type_concept_id', _INT, False),
+        ('cohort_definition_syntax', _TEXT, True),
+        ('subject_concept_id', _INT, False),
+        ('cohort_initiation_date', _DATE, True)],
+}
+
+_V5_3_TABLES = {
+    'visit_occurrence': [
+        ('visit_occurrence_id', _INT, False),
+        ('person_id', _INT, False),
+        ('visit_concept_id', _INT, False),
+        ('visit_start_date', _DATE, False),
+        ('visit_start_datetime', _DATETIME, True),
+        ('visit_end_date', _DATE, False),
+        ('visit_end_datetime', _DATETIME, True),
+        ('visit_type_concept_id', _INT, False),
+        ('provider_id', _INT, True),
+        ('care_site_id', _INT, True),
+        ('visit_source_value', _VARCHAR(50), True),
+        ('visit_source_concept_id', _INT, True),
+        ('admitting_source_concept_id', _INT, True),
+        ('admitting_source_value', _VARCHAR(50), True),
+        ('discharge_to_concept_id', _INT, True),
+        ('discharge_to_source_value', _VARCHAR(50), True),
+        ('preceding_visit_occurrence_id', _INT, True)],
+    'visit_detail': [
+        ('visit_detail_id', _INT, False),
+        ('person_id', _INT, False),
+        ('visit_detail_concept_id', _INT, False),
+        ('visit_detail_start_date', _DATE, False),
+        ('visit_detail_start_datetime', _DATETIME, True),
+        ('visit_detail_end_date', _DATE, False),
+        ('visit_detail_end_datetime', _DATETIME, True),
+        ('visit_detail_type_concept_id', _INT, False),
+        ('provider_id', _INT, True),
+        ('care_site_id', _INT, True),
+        ('visit_detail_source_value', _VARCHAR(50), True),
+        ('visit_detail_source_concept_id', _INT, True),
+        ('admitting_source_value', _VARCHAR(50), True),
+        ('admitting_source_concept_id', _INT, True),
+        ('discharge_to_source_value', _VARCHAR(50), True),
+        ('discharge_to_concept_id', _INT, True),
+        ('preceding_visit_detail_id', _INT, True),
+        ('visit_detail_parent_id', _INT, True),
+        ('visit_occurrence_id', _INT, False)],
+    'condition_occurrence': [
+        ('condition_occurrence_id', _INT, False),
+        ('person_id', _INT, False),
+        ('condition_concept_id', _INT, False),
+        ('condition_start_date', _DATE, False),
+        ('condition_start_datetime', _DATETIME, True),
+        ('condition_end_date', _DATE, True),
+        ('condition_end_datetime', _DATETIME, True),
+        ('condition_type_concept_id', _INT, False),
+        ('stop_reason', _VARCHAR(20), True),
+        ('provider_id', _INT, True),
+        ('visit_occurrence_id', _INT, True),
+        ('visit_detail_id', _INT, True),
+        ('condition_source_value', _VARCHAR(50), True),
+        ('condition_source_concept_id', _INT, True),
+        ('condition_status_source_value', _VARCHAR(50), True),
+        ('condition_status_concept_id', _INT, True)],
+    'procedure_occurrence': [
+        ('procedure_occurrence_id', _INT, False),
+        ('person_id', _INT, False),
+        ('procedure_concept_id', _INT, False),
+        ('procedure_date', _DATE, False),
+        ('procedure_datetime', _DATETIME, True),
+        ('procedure_type_concept_id', _INT, False),
+        ('modifier_concept_id', _INT, True),
+        ('quantity', _INT, True),
+        ('provider_id', _INT, True),
+        ('visit_occurrence_id', _INT, True),
+        ('visit_detail_id', _INT, True),
+        ('procedure_source_value', _VARCHAR(50), True),
+        ('procedure_source_concept_id', _INT, True),
+        ('modifier_source_value', _VARCHAR(50), True)],
+    'device_exposure': [
+        ('device_exposure_id', _INT, False),
+        ('person_id', _INT, False),
+        ('device_concept_id', _INT, False),
+        ('device_exposure_start_date', _DATE, False),
+        ('device_exposure_start_datetime', _DATETIME, True),
+        ('device_exposure_end_date', _DATE, True),
+        ('device_exposure_end_datetime', _DATETIME, True),
+        ('device_type_concept_id', _INT, False),
+        ('unique_device_id', _VARCHAR(50), True),
+        ('quantity', _INT, True),
+        ('provider_id', _INT, True),
+        ('visit_occurrence_id', _INT, True),
+        ('visit_detail_id', _INT, True),
+        ('device_source_value', _VARCHAR(50), True),
+        ('device_source_concept_id', _INT, True)],
+    'measurement': [
+        ('measurement_id', _INT, False),
+        ('person_id', _INT, False),
+        ('measurement_concept_id', _INT, False),
+        ('measurement_date', _DATE, False),
+        ('measurement_datetime', _DATETIME, True),
+        ('measurement_time', _VARCHAR(10), True),
+        ('measurement_type_concept_id', _INT, False),
+        ('operator_concept_id', _INT, True),
+        ('value_as_number', _NUMERIC, True),
+        ('value_as_concept_id', _INT, True),
+        ('unit_concept_id', _INT, True),
+        ('range_low', _NUMERIC, True),
+        ('range_high', _NUMERIC, True),
+        ('provider_id', _INT, True),
+        ('visit_occurrence_id', _INT, True),
+        ('visit_detail_id', _INT, True),
+        ('measurement_source_value', _VARCHAR(50), True),
+        ('measurement_source_concept_id', _INT, True),
+        ('unit_source_value', _VARCHAR(50), True),
+        ('value_source_value', _VARCHAR(50), True)],
+    'observation': [
+        ('observation_id', _INT, False),
+        ('person_id', _INT, False),
+        ('observation_concept_id', _INT, False),
+        ('observation_date', _DATE, False),
+        ('observation_datetime', _DATETIME, True),
+        ('observation_type_concept_id', _INT, False),
+        ('value_as_number', _NUMERIC, True),
+        ('value_as_string', _VARCHAR(60), True),
+        ('value_as_concept_id', _INT, True),
+        ('qualifier_concept_id', _INT, True),
+        ('unit_concept_id', _INT, True),
+        ('provider_id', _INT, True),
+        ('visit_occurrence_id', _INT, True),
+        ('visit_detail_id', _INT, True),
+        ('observation_source_value', _VARCHAR(50), True),
+        ('observation_source_concept_id', _INT, True),
+        ('unit_source_value', _VARCHAR(50), True),
+        ('qualifier_source_value', _VARCHAR(50), True)],
+    'note': [
+        ('note_id', _INT, False),
+        ('person_id', _INT, False),
+        ('note_date', _DATE, False),
+        ('note_datetime', _DATETIME, True),
+        ('note_type_concept_id', _INT, False),
+        ('note_class_concept_id', _INT, False),
+        ('note_title', _VARCHAR(250), True),
+        ('note_text', _TEXT, False),
+        ('encoding_concept_id', _INT, False),
+        ('language_concept_id', _INT, False),
+        ('provider_id', _INT, True),
+        ('visit_occurrence_id', _INT, True),
+        ('visit_detail_id', _INT, True),
+        ('note_source_value', _VARCHAR(50), True)],
+    'location': [
+        ('location_id', _INT, False),
+        ('address_1', _VARCHAR(50), True),
+        ('address_2', _VARCHAR(50), True),
+        ('city', _VARCHAR(50), True),
+        ('state', _VARCHAR(2), True),
+        ('zip', _VARCHAR(9), True),
+        ('county', _VARCHAR(20), True),
+        ('location_source_value', _VARCHAR(50), True)],
+    'metadata': [
+        ('metadata_concept_id', _INT, False),
+        ('metadata_type_concept_id', _INT, False),
+        ('name', _VARCHAR(250), False),
+        ('value_as_string', _VARCHAR(250), True),
+        ('value_as_concept_id', _INT, True),
+        ('metadata_date', _DATE, True),
+        ('metadata_datetime', _DATETIME, True)],
+    'cdm_source': [
+        ('cdm_source_name', _VARCHAR(255), False),
+        ('cdm_source_abbreviation', _VARCHAR(25), True),
+        ('cdm_holder', _VARCHAR(255), True),
+        ('source_description', _TEXT, True),
+        ('source_documentation_reference', _VARCHAR(255), True),
+        ('cdm_etl_reference', _VARCHAR(255), True),
+        ('source_release_date', _DATE, True),
+        ('cdm_release_date', _DATE, True),
+        ('cdm_version', _VARCHAR(10), True),
+        ('vocabulary_version', _VARCHAR(20), True)],
+    'attribute_definition': [
+        ('attribute_definition_id', _INT, False),
+        ('attribute_name', _VARCHAR(255), False),
+        ('attribute_description', _TEXT, True),
+        ('attribute_type_concept_id', _INT, False),
+        ('attribute_syntax', _TEXT, True)],
+    'cohort_attribute': [
+        ('cohort_definition_id', _INT, False),
+        ('subject_id', _INT, False),
+        ('cohort_start_date', _DATE, False),
+        ('cohort_end_date', _DATE, False),
+        ('attribute_definition_id', _INT, False),
+        ('value_as_number', _NUMERIC, True),
+        ('value_as_concept_id', _INT, True)],
+}
+
+_V5_4_TABLES = {
+    'visit_occurrence': [
+        ('visit_occurrence_id', _INT, False),
+        ('person_id', _INT, False),
+        ('visit_concept_id', _INT, False),
+        ('visit_start_date', _DATE, False),
+        ('visit_start_datetime', _DATETIME, True),
+        ('visit_end_date', _DATE, False),
+        ('visit_end_datetime', _DATETIME, True),
+        ('visit_type_concept_id', _INT, False),
+        ('provider_id', _INT, True),
+        ('care_site_id', _INT, True),
+        ('visit_source_value', _VARCHAR(50), True),
+        ('visit_source_concept_id', _INT, True),
+        ('admitted_from_concept_id', _INT, True),
+        ('admitted_from_source_value', _VARCHAR(50), True),
+        ('discharged_to_concept_id', _INT, True),
+        ('discharged_to_source_value', _VARCHAR(50), True),
+        ('preceding_visit_occurrence_id', _INT, True)],
+    'visit_detail': [
+        ('visit_detail_id', _INT, False),
+        ('person_id', _INT, False),
+        ('visit_detail_concept_id', _INT, False),
+        ('visit_detail_start_date', _DATE, False),
+        ('visit_detail_start_datetime', _DATETIME, True),
+        ('visit_detail_end_date', _DATE, False),
+        ('visit_detail_end_datetime', _DATETIME, True),
+        ('visit_detail_type_concept_id', _INT, False),
+        ('provider_id', _INT, True),
+        ('care_site_id', _INT, True),
+        ('visit_detail_source_value', _VARCHAR(50), True),
+        ('visit_detail_source_concept_id', _INT, True),
+        ('admitted_from_concept_id', _INT, True),
+        ('admitted_from_source_value', _VARCHAR(50), True),
+        ('discharged_to_source_value', _VARCHAR(50), True),
+        ('discharged_to_concept_id', _INT, True),
+        ('preceding_visit_detail_id', _INT, True),
+        ('parent_visit_detail_id', _INT, True),
+        ('visit_occurrence_id', _INT, False)],
+    'condition_occurrence': [
+        ('condition_occurrence_id', _INT, False),
+        ('person_id', _INT, False),
+        ('condition_concept_id', _INT, False),
+        ('condition_start_date', _DATE, False),
+        ('condition_start_datetime', _DATETIME, True),
+        ('condition_end_date', _DATE, True),
+        ('condition_end_datetime', _DATETIME, True),
+        ('condition_type_concept_id', _INT, False),
+        ('condition_status_concept_id', _INT, True),
+        ('stop_reason', _VARCHAR(20), True),
+        ('provider_id', _INT, True),
+        ('visit_occurrence_id', _INT, True),
+        ('visit_detail_id', _INT, True),
+        ('condition_source_value', _VARCHAR(50), True),
+        ('condition_source_concept_id', _INT, True),
+        ('condition_status_source_value', _VARCHAR(50), True)],
+    'procedure_occurrence': [
+        ('procedure_occurrence_id', _INT, False),
+        ('person_id', _INT, False),
+        ('procedure_concept_id', _INT, False),
+        ('procedure_date', _DATE, False),
+        ('procedure_datetime', _DATETIME, True),
+        ('procedure_end_date', _DATE, True),
+        ('procedure_end_datetime', _DATETIME, True),
+        ('procedure_type_concept_id', _INT, False),
+        ('modifier_concept_id', _INT, True),
+        ('quantity', _INT, True),
+        ('provider_id', _INT, True),
+        ('visit_occurrence_id', _INT, True),
+        ('visit_detail_id', _INT, True),
+        ('procedure_source_value', _VARCHAR(50), True),
+        ('procedure_source_concept_id', _INT, True),
+        ('modifier_source_value', _VARCHAR(50), True)],
+    'device_exposure': [
+        ('device_exposure_id', _INT, False),
+        ('person_id', _INT, False),
+        ('device_concept_id', _INT, False),
+        ('device_exposure_start_date', _DATE, False),
+        ('device_exposure_start_datetime', _DATETIME, True),
+        ('device_exposure_end_date', _DATE, True),
+        ('device_exposure_end_datetime', _DATETIME, True),
+        ('device_type_concept_id', _INT, False),
+        ('unique_device_id', _VARCHAR(255), True),
+        ('production_id', _VARCHAR(255), True),
+        ('quantity', _INT, True),
+        ('provider_id', _INT, True),
+        ('visit_occurrence_id', _INT, True),
+        ('visit_detail_id', _INT, True),
+        ('device_source_value', _VARCHAR(50), True),
+        ('device_source_concept_id', _INT, True),
+        ('unit_concept_id', _INT, True),
+        ('unit_source_value', _VARCHAR(50), True),
+        ('unit_source_concept_id', _INT, True)],
+    'measurement': [
+        ('measurement_id', _INT, False),
+        ('person_id', _INT, False),
+        ('measurement_concept_id', _INT, False),
+        ('measurement_date', _DATE, False),
+        ('measurement_datetime', _DATETIME, True),
+        ('measurement_time', _VARCHAR(10), True),
+        ('measurement_type_concept_id', _INT, False),
+        ('operator_concept_id', _INT, True),
+        ('value_as_number', _NUMERIC, True),
+        ('value_as_concept_id', _INT, True),
+        ('unit_concept_id', _INT, True),
+        ('range_low', _NUMERIC, True),
+        ('range_high', _NUMERIC, True),
+        ('provider_id', _INT, True),
+        ('visit_occurrence_id', _INT, True),
+        ('visit_detail_id', _INT, True),
+        ('measurement_source_value', _VARCHAR(50), True),
+        ('measurement_source_concept_id', _INT, True),
+        ('unit_source_value', _VARCHAR(50), True),
+        ('unit_source_concept_id', _INT, True),
+        ('value_source_value', _VARCHAR(50), True),
+        ('measurement_event_id', _BIGINT, True),
+        ('meas_event_field_concept_id', _INT, True)],
+    'observation': [
+        ('observation_id', _INT, False),
+        ('person_id', _INT, False),
+        ('observation_concept_id', _INT, False),
+        ('observation_date', _DATE, False),
+        ('observation_datetime', _DATETIME, True),
+        ('observation_type_concept_id', _INT, False),
+        ('value_as_number', _NUMERIC, True),
+        ('value_as_string', _VARCHAR(60), True),
+        ('value_as_concept_id', _INT, True),
+        ('qualifier_concept_id', _INT, True),
+        ('unit_concept_id', _INT, True),
+        ('provider_id', _INT, True),
+        ('visit_occurrence_id', _INT, True),
+        ('visit_detail_id', _INT, True),
+        ('observation_source_value', _VARCHAR(50), True),
+        ('observation_source_concept_id', _INT, True),
+        ('unit_source_value', _VARCHAR(50), True),
+        ('qualifier_source_value', _VARCHAR(50), True),
+        ('value_source_value', _VARCHAR(50), True),
+        ('observation_event_id', _BIGINT, True),
+        ('obs_event_field_concept_id', _INT, True)],
+    'note': [
+        ('note_id', _INT, False),
+        ('person_id', _INT, False),
+        ('note_date', _DATE, False),
+        ('note_datetime', _DATETIME, True),
+        ('note_type_concept_id', _INT, False),
+        ('note_class_concept_id', _INT, False),
+        ('note_title', _VARCHAR(250), True),
+        ('note_text', _TEXT, False),
+        ('encoding_concept_id', _INT, False),
+        ('language_concept_id', _INT, False),
+        ('provider_id', _INT, True),
+        ('visit_occurrence_id', _INT, True),
+        ('visit_detail_id', _INT, True),
+        ('note_source_value', _VARCHAR(50), True),
+        ('note_event_id', _BIGINT, True),
+        ('note_event_field_concept_id', _INT, True)],
+    'location': [
+        ('location_id', _INT, False),
+        ('address_1', _VARCHAR(50), True),
+        ('address_2', _VARCHAR(50), True),
+        ('city', _VARCHAR(50), True),
+        ('state', _VARCHAR(2), True),
+        ('zip', _VARCHAR(9), True),
+        ('county', _VARCHAR(20), True),
+        ('location_source_value', _VARCHAR(50), True),
+        ('country_concept_id', _INT, True),
+        ('country_source_value', _VARCHAR(80), True),
+        ('latitude', _NUMERIC, True),
+        ('longitude', _NUMERIC, True)],
+    'metadata': [
+        ('metadata_id', _INT, False),
+        ('metadata_concept_id', _INT, False),
+        ('metadata_type_concept_id', _INT, False),
+        ('name', _VARCHAR(250), False),
+        ('value_as_string', _VARCHAR(250), True),
+        ('value_as_concept_id', _INT, True),
+        ('value_as_number', _NUMERIC, True),
+        ('metadata_date', _DATE, True),
+        ('metadata_datetime', _DATETIME, True)],
+    'cdm_source': [
+        ('cdm_source_name', _VARCHAR(255), False),
+        ('cdm_source_abbreviation', _VARCHAR(25), False),
+        ('cdm_holder', _VARCHAR(255), False),
+        ('source_description', _TEXT, True),
+        ('source_documentation_reference', _VARCHAR(255), True),
+        ('cdm_etl_reference', _VARCHAR(255), True),
+        ('source_release_date', _DATE, False),
+        ('cdm_release_date', _DATE, False),
+        ('cdm_version', _VARCHAR(10), True),
+        ('cdm_version_concept_id', _INT, False),
+        ('vocabulary_version', _VARCHAR(20), False)],
+    'episode': [
+        ('episode_id', _BIGINT, False),
+        ('person_id', _BIGINT, False),
+        ('episode_concept_id', _INT, False),
+        ('episode_start_date', _DATE, False),
+        ('episode_start_datetime', _DATETIME, True),
+        ('episode_end_date', _DATE, True),
+        ('episode_end_datetime', _DATETIME, True),
+        ('episode_parent_id', _BIGINT, True),
+        ('episode_number', _INT, True),
+        ('episode_object_concept_id', _INT, False),
+        ('episode_type_concept_id', _INT, False),
+        ('episode_source_value', _VARCHAR(50), True),
+        ('episode_source_concept_id', _INT, True)],
+    'episode_event': [
+        ('episode_id', _BIGINT, False),
+        ('event_id', _BIGINT, False),
+        ('episode_event_field_concept_id', _INT, False)],
+}
+
+# tables with a primary key in the published DDL, the primary key is always the first column
+_PRIMARY_KEYS = {'person', 'observation_period', 'visit_occurrence', 'visit_detail', 'condition_occurrence',
+    'drug_exposure', 'procedure_occurrence', 'device_exposure', 'measurement', 'observation', 'note', 'note_nlp',
+    'specimen', 'location', 'care_site', 'provider', 'payer_plan_period', 'cost', 'drug_era', 'dose_era',
+    'condition_era', 'episode', 'metadata', 'concept', 'vocabulary', 'domain', 'concept_class', 'relationship',
+    'cohort_definition', 'attribute_definition'}
+
+_VERSION_TABLES = {'5.3': _V5_3_TABLES, '5.4': _V5_4_TABLES}
+
+
+def cdm_table_names(cdm_version):
+    """
+    Returns the names of all tables defined by an OMOP CDM version.
+
+    Parameters
+    ----------
+    cdm_version : str
+        one of inspectomop.cdm.CDM_VERSIONS
+
+    Returns
+    -------
+    table_names : list of str
+    """
+    if cdm_version not in _VERSION_TABLES:
+        raise ValueError('cdm_version must be one of {}, got {!r}'.format(CDM_VERSIONS, cdm_version))
+    return sorted(list(_SHARED_TABLES.keys()) + list(_VERSION_TABLES[cdm_version].keys()))
+
+
+def cdm_metadata(cdm_version, schema=None, metadata=None, only=None):
+    """
+    Returns a sqlalchemy.MetaData containing the tables of an OMOP CDM version.
+
+    Parameters
+    ----------
+    cdm_version : str
+        one of inspectomop.cdm.CDM_VERSIONS
+    schema : str, optional
+        schema the tables live in
+    metadata : sqlalchemy.MetaData, optional
+        an existing MetaData to add the tables to
+    only : list of str, optional
+        only define these tables
+
+    Returns
+    -------
+    metadata : sqlalchemy.MetaData
+
+    Examples
+    --------
+    >>> from inspectomop.cdm import cdm_metadata
+    >>> metadata = cdm_metadata('5.4', schema='cdm')
+    >>> metadata.tables['cdm.person'].c.person_id
+    """
+    table_names = cdm_table_names(cdm_version)
+    if metadata is None:
+        metadata = _MetaData(schema=schema)
+    definitions = dict(_SHARED_TABLES)
+    definitions.update(_VERSION_TABLES[cdm_version])
+    for table_name in table_names:
+        if only is not None and table_name not in only:
+            continue
+        columns = [_Column(name, col_type, nullable=nullable, primary_key=(index == 0 and table_name in _PRIMARY_KEYS))
+            for index, (name, col_type, nullable) in enumerate(definitions[table_name])]
+        _Table(table_name, metadata, *columns, schema=schema)
+    return metadata
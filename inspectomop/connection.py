@@ -1,3 +1,8 @@
+import csv as _csv
+import io as _io
+import os as _os
+
+from sqlalchemy import text as _text
 from sqlalchemy.engine import Connection as _AlchemyConnection
 
 from .results import Results
@@ -11,11 +16,11 @@ class Connection(_AlchemyConnection):
 
     See Also
     --------
-    inspectomop.results.Results
+    inspectomop.results.Results, Connection.export
     """
 
 
-    def execute(self, statement, parameters = None, execution_options = None):
+    def execute(self, statement, parameters = None, execution_options = None, chunksize = None):
         """
         Executes an SQL query on the OMOP CDM.
 
@@ -26,12 +31,21 @@ class Connection(_AlchemyConnection):
                 e.g. select([concept]).where(concept.concept_id==0)
             strings - can be a string containing an SQL statement such as
                 e.g. 'SELECT concept_name from concept where concept_id = 0'
+        parameters : dict or list of dict, optional
+            values for bound parameters of the statement
+        execution_options : dict, optional
+            sqlalchemy execution options for this statement
+        chunksize : int, optional
+            Set when the results are consumed in chunks, e.g. with Results.as_pandas_chunks.
+            The rows are streamed from a server-side cursor (where the driver supports one, e.g. psycopg2 and pymysql)
+            and buffered `chunksize` rows at a time instead of loading the whole result into memory.
 
         Returns
         -------
         results : inspectomop.Results
-            The results object is a subclass of sqlalchemy.engine.CursorResult with extra methods for retrieving the results as
+            The results object wraps a sqlalchemy.engine.CursorResult with extra methods for retrieving the results as
             pandas DataFrames.  Traditional methods conforming to the python DB connection spec work as well e.g. fetchone, fetchmany, fetchall
+            Results is not a CursorResult subclass, isinstance checks against sqlalchemy result classes are False.
 
         Notes
         -----
@@ -42,4 +56,99 @@ class Connection(_AlchemyConnection):
         --------
         inpsectomop.Results, inspectomop.queries
         """
-        return Results(super().execute(statement, parameters=parameters, execution_options=execution_options)) 
\ No newline at end of file
+        if chunksize is not None:
+            # yield_per turns on stream_results and limits the row buffer to chunksize rows
+            execution_options = dict(execution_options or {}, yield_per=chunksize)
+        return Results(super().execute(statement, parameters=parameters, execution_options=execution_options)) 
+
+    def export(self, statement, sink, format='csv', header=True, chunksize=100000):
+        """
+        Exports the results of a query in bulk using the database's native export where available.
+
+        Parameters
+        ----------
+        statement : sqlalchemy object or string
+            any query, e.g. a statement returned by the functions in inspectomop.queries
+        sink : str or file-like
+            path of the file to write or a file-like object opened for writing
+        format : str, default 'csv'
+            - 'csv' : comma separated values
+            - 'binary' : the PostgreSQL binary COPY format (PostgreSQL only)
+            - 'parquet' : Parquet, see Results.to_parquet (requires pyarrow on dialects other than DuckDB)
+        header : bool, default True
+            whether CSV output starts with a header row of column names
+        chunksize : int, default 100000
+            number of rows fetched at a time when the rows are exported through the driver
+
+        Notes
+        -----
+        The statement is compiled for the dialect with its parameters rendered inline.
+        PostgreSQL streams ``COPY (...) TO STDOUT`` into the sink (psycopg2 and psycopg 3),
+        DuckDB runs ``COPY (...) TO`` when `sink` is a path.  All other cases fall back to
+        fetching `chunksize` rows at a time from a server-side cursor.
+
+        Examples
+        --------
+        >>> from inspectomop.queries.general import concepts_for_concept_ids
+        >>> statement = concepts_for_concept_ids([2, 3, 4], inspector)
+        >>> with inspector.connect() as connection:
+        >>>     connection.export(statement, 'concepts.csv')
+        """
+        if format not in ('csv', 'binary', 'parquet'):
+            raise ValueError('Unsupported export format {!r}, expected one of csv, binary or parquet'.format(format))
+        dialect = self.dialect.name
+        if format == 'binary' and dialect != 'postgresql':
+            raise ValueError('The binary format is only supported by the postgresql dialect, not {}'.format(dialect))
+        is_path = isinstance(sink, (str, _os.PathLike))
+
+        if dialect == 'postgresql' and format != 'parquet':
+            options = 'FORMAT binary' if format == 'binary' else 'FORMAT csv, HEADER {}'.format(str(bool(header)).lower())
+            copy_sql = 'COPY ({}) TO STDOUT WITH ({})'.format(self._literal_sql(statement), options)
+            if is_path:
+                with open(sink, 'wb') as fh:
+                    self._copy_to(copy_sql, fh)
+            else:
+                self._copy_to(copy_sql, sink)
+            return
+        if dialect == 'duckdb' and is_path:
+            options = 'FORMAT parquet' if format == 'parquet' else 'FORMAT csv, HEADER {}'.format(str(bool(header)).lower())
+            path = _os.fspath(sink).replace("'", "''")
+            self.exec_driver_sql("COPY ({}) TO '{}' ({})".format(self._literal_sql(statement), path, options))
+            return
+
+        if isinstance(statement, str):
+            statement = _text(statement)
+        results = self.execute(statement, chunksize=chunksize)
+        if format == 'parquet':
+            results.to_parquet(sink, row_group_size=chunksize)
+            return
+        if is_path:
+            with open(sink, 'w', newline='') as fh:
+                self._write_csv(results, fh, header, chunksize)
+        else:
+            self._write_csv(results, sink, header, chunksize)
+
+    def _literal_sql(self, statement):
+        if isinstance(statement, str):
+            return statement
+        return str(statement.compile(dialect=self.dialect, compile_kwargs={'literal_binds': True}))
+
+    def _copy_to(self, copy_sql, sink):
+        cursor = self.connection.dbapi_connection.cursor()
+        try:
+            if hasattr(cursor, 'copy_expert'): # psycopg2
+                cursor.copy_expert(copy_sql, sink)
+                return
+            text_sink = isinstance(sink, _io.TextIOBase)
+            with cursor.copy(copy_sql) as copy: # psycopg 3
+                for data in copy:
+                    sink.write(bytes(data).decode('utf-8') if text_sink else data)
+        finally:
+            cursor.close()
+
+    def _write_csv(self, results, sink, header, chunksize):
+        writer = _csv.writer(sink)
+        if header:
+            writer.writerow(results.keys())
+        for rows in results.partitions(chunksize):
+            writer.writerows(rows)
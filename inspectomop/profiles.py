@@ -0,0 +1,114 @@
+"""
+Named connection profiles that tune database connections for a workload.
+
+A profile is selected with ``Inspector(connection_url, profile=name)``.
+"""
+import os as _os
+from urllib.parse import quote as _quote
+
+from sqlalchemy import event as _event
+from sqlalchemy.engine import make_url as _make_url
+
+CONNECTION_PROFILES = {
+    'sqlite-analytics': {
+        'dialect': 'sqlite',
+        'immutable': True,
+        'pragmas': [
+            ('mmap_size', 268435456),  # memory map up to 256 MiB of the database file
+            ('cache_size', -262144),   # 256 MiB page cache, negative values are in KiB
+            ('query_only', 'ON'),      # reject any statement that would write to the database
+        ],
+    },
+}
+
+
+def _sqlite_uses_wal(db_file):
+    # bytes 18 and 19 of the database header are the file format write/read versions, 2 means WAL
+    try:
+        with open(db_file, 'rb') as fh:
+            header = fh.read(20)
+    except OSError:
+        return False
+    return len(header) == 20 and (header[18] == 2 or header[19] == 2)
+
+
+def profile_url(connection_url, profile):
+    """
+    Returns the connection URL to use for `profile`.
+
+    Parameters
+    ----------
+    connection_url : str
+    profile : str
+        a key of CONNECTION_PROFILES
+
+    Returns
+    -------
+    connection_url : str
+
+    Raises
+    ------
+    ValueError
+        If the profile does not exist or does not support the dialect of `connection_url`.
+
+    Notes
+    -----
+    For profiles marking the database immutable, file based SQLite URLs are rewritten to open the database
+    read-only as an ``immutable=1`` URI, which skips file locking and change detection entirely.
+    Databases in WAL mode are only opened read-only (``mode=ro``) since SQLite ignores the write-ahead log
+    of immutable databases and would miss committed transactions that have not been checkpointed yet.
+    """
+    settings = _profile_settings(profile)
+    url = _make_url(connection_url)
+    _check_dialect(profile, url.get_backend_name())
+    if not settings.get('immutable'):
+        return connection_url
+    db_file = url.database
+    if not db_file or db_file == ':memory:' or db_file.startswith('file:') or url.query.get('uri'):
+        return connection_url
+    query = {'mode': 'ro', 'uri': 'true'}
+    if not _sqlite_uses_wal(db_file) and not _os.path.exists(db_file + '-wal'):
+        query['immutable'] = '1'
+    url = url.set(database='file:' + _quote(_os.path.abspath(db_file)), query=query)
+    return url.render_as_string(hide_password=False)
+
+
+def apply_profile(engine, profile):
+    """
+    Applies the connection settings of `profile` to every connection the engine's pool opens.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+    profile : str
+        a key of CONNECTION_PROFILES
+
+    Raises
+    ------
+    ValueError
+        If the profile does not exist or does not support the dialect of `engine`.
+    """
+    settings = _profile_settings(profile)
+    _check_dialect(profile, engine.dialect.name)
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in settings['pragmas']:
+            cursor.execute('PRAGMA {} = {}'.format(name, value))
+        cursor.close()
+
+    _event.listen(engine, 'connect', set_pragmas)
+
+
+def _profile_settings(profile):
+    try:
+        return CONNECTION_PROFILES[profile]
+    except KeyError:
+        raise ValueError('Unknown connection profile {!r}, expected one of {}'.format(
+            profile, ', '.join(sorted(CONNECTION_PROFILES)))) from None
+
+
+def _check_dialect(profile, dialect):
+    expected = _profile_settings(profile)['dialect']
+    if dialect != expected:
+        raise ValueError('Profile {!r} only supports the {} dialect, not {}'.format(profile, expected, dialect))
@@ -1,8 +1,37 @@
-from .care_site import *
-from .condition import *
-from .drug import *
-from .general import *
-from .observation import *
-from .payer_plan import *
-from .person import *
-from .procedure import *
+"""
+OMOP data queries.
+
+Query submodules are imported on first attribute access, e.g. `inspectomop.queries.general` or
+`inspectomop.queries.concepts_for_concept_ids`, to keep `import inspectomop` fast.
+"""
+import importlib as _importlib
+
+_submodules = ['care_site', 'condition', 'drug', 'general', 'observation', 'payer_plan', 'person', 'procedure']
+
+
+def _public_names(module):
+    return [name for name in vars(module) if not name.startswith('_') and name not in _submodules]
+
+
+def __getattr__(name):
+    if name in _submodules:
+        return _importlib.import_module('.' + name, __name__)
+    if name == '__all__':
+        all_names = list(_submodules)
+        for submodule in _submodules:
+            all_names.extend(_public_names(__getattr__(submodule)))
+        return all_names
+    if name.startswith('__'):
+        raise AttributeError(name)
+    # query functions are looked up in the submodules in the order the star imports used to run
+    for submodule in _submodules:
+        module = __getattr__(submodule)
+        if name in _public_names(module):
+            value = getattr(module, name)
+            globals()[name] = value
+            return value
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_submodules))
@@ -10,8 +10,10 @@ from sqlalchemy import select as _select, join as _join,\
     distinct as _distinct, between as  _between, alias as _alias, \
     and_ as _and_, or_ as _or_, literal_column as _literal_column, func as _func
 
-import pandas as _pd
+from ..cache import cached_statement as _cached_statement
 
+
+@_cached_statement()
 def facility_counts_by_type(inspector, return_columns=None):
     """
     Returns facility counts by type in the OMOP CDM i.e. # Inpatient Hospitals, Offices, etc.
@@ -52,6 +54,7 @@ def facility_counts_by_type(inspector, return_columns=None):
                 group_by(cs.c.place_of_service_concept_id)
     return statement
 
+@_cached_statement()
 def patient_counts_by_care_site_type(inspector, return_columns=None):
     """
     Returns patients counts by facility type.
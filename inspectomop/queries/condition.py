@@ -4,10 +4,14 @@
 from sqlalchemy import select as _select, join as _join,\
     union as _union, union_all as _union_all, \
     distinct as _distinct, between as  _between, alias as _alias, \
-    and_ as _and_, or_ as _or_, literal_column as _literal_column, func as _func
+    and_ as _and_, or_ as _or_, literal_column as _literal_column, func as _func, bindparam as _bindparam
 
-import pandas as _pd
+from ..cache import cached_statement as _cached_statement
+from ..search import keyword_criterion as _keyword_criterion, keyword_variant as _keyword_variant, \
+    keyword_params as _keyword_params
 
+
+@_cached_statement()
 def condition_concept_for_concept_id(concept_id, inspector, return_columns=None):
     """
     Retrieves the condition concept for a condition_concept_id.
@@ -65,7 +69,7 @@ def condition_concept_for_concept_id(concept_id, inspector, return_columns=None)
         columns = [col for col in columns if col.name in return_columns]
     statement = _select(*columns)\
                 .where(_and_(\
-                    c.c.concept_id == concept_id,\
+                    c.c.concept_id == _bindparam('concept_id', concept_id),\
                     c.c.vocabulary_id == v.c.vocabulary_id,\
                     c.c.domain_id == domain_id,\
                     c.c.standard_concept == standard_concept))
@@ -141,11 +145,12 @@ def condition_concepts_for_keyword(keyword, inspector, return_columns=None):
                 .where(_and_(\
                 _or_(c.vocabulary_id.in_(vocab_ids), _func.lower(c.concept_class_id)==concept_class_id),\
                 c.concept_class_id != None,\
-                _or_(_func.lower(c.concept_name).ilike('%{}%'.format(keyword.lower())),\
-                    _func.lower(cs.concept_synonym_name).ilike('%{}%'.format(keyword.lower())))))\
+                _or_(_keyword_criterion(keyword, c.concept_name, c.concept_id, inspector),\
+                    _keyword_criterion(keyword, cs.concept_synonym_name, c.concept_id, inspector))))\
                 .distinct()
     return statement
 
+@_cached_statement()
 def condition_concepts_for_source_codes(source_codes, inspector, return_columns=None):
     """
     Retrieves standard condition concepts for source codes.  Ex ICD-9-CM --> SNOMED-CT
@@ -232,11 +237,12 @@ def condition_concepts_for_source_codes(source_codes, inspector, return_columns=
                     c1.c.vocabulary_id == vs.c.vocabulary_id,\
                     c1.c.domain_id == domain_id,\
                     c2.c.vocabulary_id == vt.c.vocabulary_id,\
-                    c1.c.concept_code.in_(source_codes),\
+                    c1.c.concept_code.in_(_bindparam('source_codes', source_codes, expanding=True)),\
                     c2.c.vocabulary_id == vocab_id))\
                 .distinct()
     return statement
 
+@_cached_statement()
 def source_codes_for_concept_ids(concept_ids, inspector, return_columns=None):
     """
     Retreives source condition concepts for OMOP concept_ids.  i.e SNOMED-CT --> ICD-9-CM, ICD-10-CM
@@ -323,11 +329,12 @@ def source_codes_for_concept_ids(concept_ids, inspector, return_columns=None):
                     c1.c.vocabulary_id == vs.c.vocabulary_id,\
                     c1.c.domain_id == domain_id,\
                     c2.c.vocabulary_id == vt.c.vocabulary_id,\
-                    c1.c.concept_id.in_(concept_ids),\
+                    c1.c.concept_id.in_(_bindparam('concept_ids', concept_ids, expanding=True)),\
                     c2.c.vocabulary_id == vocab_id))\
                 .distinct()
     return statement
 
+@_cached_statement(variant=_keyword_variant, params=_keyword_params)
 def pathogen_concept_for_keyword(keyword, inspector, return_columns=None):
     """
     Retrieves pathogen concepts based on a keyword with 'Organsim' as the concept_class_id.
@@ -386,10 +393,11 @@ def pathogen_concept_for_keyword(keyword, inspector, return_columns=None):
     statement = _select(*columns)\
                 .where(_and_(\
                     c.c.concept_class_id == concept_class_id,\
-                    _func.lower(c.c.concept_name).ilike('%{}%'.format(keyword.lower())),\
+                    _keyword_criterion(keyword, c.c.concept_name, c.c.concept_id, inspector),\
                     c.c.vocabulary_id == v.c.vocabulary_id))
     return statement
 
+@_cached_statement(variant=_keyword_variant, params=_keyword_params)
 def disease_causing_agents_for_keyword(keyword, inspector, return_columns=None):
     """
     Retrieves disease causing agents by keyword.  The concept_class_id can be any of: 'Pharmaceutical / biologic product',\
@@ -453,10 +461,11 @@ def disease_causing_agents_for_keyword(keyword, inspector, return_columns=None):
     statement = _select(*columns)\
                 .where(_and_(\
                     _func.lower(c.c.concept_class_id).in_(concept_class_ids),\
-                    _func.lower(c.c.concept_name).ilike('%{}%'.format(keyword.lower())),\
+                    _keyword_criterion(keyword, c.c.concept_name, c.c.concept_id, inspector),\
                     c.c.vocabulary_id == v.c.vocabulary_id))
     return statement
 
+@_cached_statement()
 def conditions_caused_by_pathogen_or_causative_agent_concept_id(concept_id, inspector, return_columns=None):
     """
     Retreives all conditions caused by a pathogen or other causative agent concept_id.
@@ -540,10 +549,11 @@ def conditions_caused_by_pathogen_or_causative_agent_concept_id(concept_id, insp
                     cr.c.concept_id_1 == a.c.concept_id,\
                     a.c.vocabulary_id == va.c.vocabulary_id,\
                     cr.c.concept_id_2 == d.c.concept_id,\
-                    d.c.concept_id == concept_id,\
+                    d.c.concept_id == _bindparam('concept_id', concept_id),\
                     d.c.vocabulary_id == vs.c.vocabulary_id))
     return statement
 
+@_cached_statement(variant=_keyword_variant, params=_keyword_params)
 def anatomical_site_by_keyword(keyword, inspector, return_columns=None):
     """
     Retrieves anatomical site concepts given a keyword.  Results of this query are useful for `condition_concepts_occurring_at_anatomical_site_concept_id`
@@ -600,10 +610,11 @@ def anatomical_site_by_keyword(keyword, inspector, return_columns=None):
     statement = _select(*columns)\
                 .where(_and_(\
                     c.c.concept_class_id == concept_class_id,\
-                    _func.lower(c.c.concept_name).ilike('%{}%'.format(keyword.lower())),\
+                    _keyword_criterion(keyword, c.c.concept_name, c.c.concept_id, inspector),\
                     c.c.vocabulary_id == v.c.vocabulary_id))
     return statement
 
+@_cached_statement()
 def condition_concepts_occurring_at_anatomical_site_concept_id(concept_id, inspector, return_columns=None):
     """
     Retrieves condition concepts that occur at a given anatomical site.  Input concept_id should be a concept of
@@ -687,12 +698,13 @@ def condition_concepts_occurring_at_anatomical_site_concept_id(concept_id, inspe
                     cr.c.concept_id_1 == a.c.concept_id,\
                     a.c.vocabulary_id == va.c.vocabulary_id,\
                     cr.c.concept_id_2 == d.c.concept_id,\
-                    d.c.concept_id == concept_id,\
+                    d.c.concept_id == _bindparam('concept_id', concept_id),\
                     d.c.vocabulary_id == vs.c.vocabulary_id))
     return statement
 
 
 
+@_cached_statement()
 def place_of_service_counts_for_condition_concept_id(condition_concept_id, inspector, return_columns=None):
     """
     Provides counts of conditions stratified by place_of_service (Office, Inpatient Hospital, etc.)
@@ -751,6 +763,7 @@ def place_of_service_counts_for_condition_concept_id(condition_concept_id, inspe
     c_place = _alias(inspector.tables['concept'], 'c_place')
     c = _alias(inspector.tables['concept'], 'c')
 
+    condition_concept_id = _bindparam('condition_concept_id', condition_concept_id)
     s1 = _select(co.c.condition_concept_id, co.c.visit_occurrence_id.label('s1_visit_id')).where(_and_(co.c.condition_concept_id == condition_concept_id, co.c.visit_occurrence_id != None))
     j1 = _join(s1, vo, s1.c.s1_visit_id == vo.c.visit_occurrence_id)
     j2 = _join(j1, cs, j1.c.vo_care_site_id == cs.c.care_site_id)
@@ -8,10 +8,12 @@ Adapted from: https://github.com/OHDSI/OMOP-Queries
 from sqlalchemy import select as _select, join as _join,\
     union as _union, union_all as _union_all, \
     distinct as _distinct, between as  _between, alias as _alias, \
-    and_ as _and_, or_ as _or_, literal_column as _literal_column, func as _func
+    and_ as _and_, or_ as _or_, literal_column as _literal_column, func as _func, bindparam as _bindparam
 
-import pandas as pd
+from ..cache import cached_statement as _cached_statement
 
+
+@_cached_statement()
 def ingredients_for_drug_concept_ids(concept_ids, inspector, return_columns=None):
     """
     Get ingredients for brand or generic drug concept_ids.
@@ -67,11 +69,12 @@ def ingredients_for_drug_concept_ids(concept_ids, inspector, return_columns=None
                     ca.c.descendant_concept_id == d.c.concept_id,\
                     ca.c.ancestor_concept_id == a.c.concept_id,\
                     a.c.concept_class_id == 'Ingredient',\
-                    ca.c.descendant_concept_id.in_(concept_ids)))
+                    ca.c.descendant_concept_id.in_(_bindparam('concept_ids', concept_ids, expanding=True))))
     return statement
 
 
 
+@_cached_statement()
 def drug_concepts_for_ingredient_concept_id(concept_id, inspector, return_columns=None):
     """
     Get all drugs that contain a given ingredient.
@@ -129,7 +132,7 @@ def drug_concepts_for_ingredient_concept_id(concept_id, inspector, return_column
     if return_columns:
         columns = [col for col in columns if col.name in return_columns]
     statement = _select(*columns).where(_and_(ca.c.ancestor_concept_id==a.c.concept_id,\
-        ca.c.descendant_concept_id == d.c.concept_id, ca.c.ancestor_concept_id == concept_id))
+        ca.c.descendant_concept_id == d.c.concept_id, ca.c.ancestor_concept_id == _bindparam('concept_id', concept_id)))
     return statement
 
 
@@ -176,6 +179,7 @@ def ingredient_concept_ids_for_ingredient_names(ingredient_names, inspector, ret
                     _func.lower(concept.concept_name).in_(map(str.lower,ingredient_names))))
     return statement
 
+@_cached_statement()
 def drug_classes_for_drug_concept_id(concept_id, inspector, return_columns=None):
     """
     Returns drug classes for drug or ingredient concept_ids.
@@ -230,9 +234,10 @@ def drug_classes_for_drug_concept_id(concept_id, inspector, return_columns=None)
                     ca.c.ancestor_concept_id == c.c.concept_id,\
                     c.c.vocabulary_id.in_(['ATC','VA Class','Mechanism of Action','Chemical Structure','ETC','Physiologic Effect']),\
                     c.c.vocabulary_id == v.c.vocabulary_id,\
-                    ca.c.descendant_concept_id == concept_id))
+                    ca.c.descendant_concept_id == _bindparam('concept_id', concept_id)))
     return statement
 
+@_cached_statement()
 def indications_for_drug_concept_id(concept_id, inspector, return_columns=None):
     """
     Find all indications for a drug given a concept_id.  Returns matches from NDFRT, FDB, and corresponding SNOMED conditions.
@@ -339,7 +344,7 @@ def indications_for_drug_concept_id(concept_id, inspector, return_columns=None):
         columns = [col for col in columns if col.name in return_columns]
     statement = _select(*columns).\
                 select_from(j4).where(_and_(\
-                de.c.concept_id == concept_id,\
+                de.c.concept_id == _bindparam('concept_id', concept_id),\
                 an.c.concept_class_id.in_(concept_class_ids),\
                 de.c.vocabulary_id.in_(vocab_ids)
                 ))
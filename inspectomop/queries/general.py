@@ -8,7 +8,11 @@ Adapted from: https://github.com/OHDSI/OMOP-Queries
 from sqlalchemy import select as _select, join as _join,\
     union as _union, union_all as _union_all, \
     distinct as _distinct, between as  _between, alias as _alias, \
-    and_ as _and_, or_ as _or_, literal_column as _literal_column
+    and_ as _and_, or_ as _or_, literal_column as _literal_column, \
+    bindparam as _bindparam, column as _column, values as _values, \
+    BigInteger as _BigInteger
+
+from ..cache import cached_statement as _cached_statement
 
 def concepts_for_concept_ids(concept_ids, inspector, return_columns=None):
     """
@@ -112,6 +116,7 @@ def synonyms_for_concept_ids(concept_ids, inspector, return_columns=None):
     statement = _select(*columns).where(concept.concept_id.in_(list(concept_ids))).where(concept.concept_id == concept_synonym.concept_id).where(concept.vocabulary_id==vocabulary.vocabulary_id)
     return statement
 
+@_cached_statement()
 def standard_vocab_for_source_code(source_code, source_vocab_id, inspector, return_columns=None):
     """
     Convert source code to all mapped standard vocabulary concepts.
@@ -178,11 +183,12 @@ def standard_vocab_for_source_code(source_code, source_vocab_id, inspector, retu
                 select_from(j2).\
                 where(_and_(\
                     cr.c.relationship_id == relationship_id,\
-                    c1.c.concept_code == source_code,\
-                    c1.c.vocabulary_id == source_vocab_id))
+                    c1.c.concept_code == _bindparam('source_code', source_code),\
+                    c1.c.vocabulary_id == _bindparam('source_vocab_id', source_vocab_id)))
     return statement
 
 
+@_cached_statement()
 def related_concepts_for_concept_id(concept_id, inspector, return_columns=None):
     """
     Find all concepts related to a concept_id.
@@ -264,18 +270,25 @@ def related_concepts_for_concept_id(concept_id, inspector, return_columns=None):
     va = _alias(inspector.tables['vocabulary'], 'va')
     vs = _alias(inspector.tables['vocabulary'], 'vs')
     rt = _alias(inspector.tables['relationship'], 'rt')
+    concept_id = _bindparam('concept_id', concept_id)
     columns = [cr.c.relationship_id, rt.c.relationship_name, \
         d.c.concept_id, d.c.concept_name, \
         d.c.concept_code, d.c.concept_class_id,\
         d.c.vocabulary_id, vs.c.vocabulary_name]
-    if return_columns:
-        columns = [col for col in columns if col.name in return_columns]
+    # concepts related by the concept_id are the first concept of the relationship
+    related_by_columns = [cr.c.relationship_id, rt.c.relationship_name, \
+        a.c.concept_id, a.c.concept_name, \
+        a.c.concept_code, a.c.concept_class_id,\
+        a.c.vocabulary_id, va.c.vocabulary_name]
     tocolumns = [_literal_column("\'Relates to\'").label('relationship_polarity')] + columns
+    bycolumns = [_literal_column("\'Is related by\'").label('relationship_polarity')] + related_by_columns
+    if return_columns:
+        tocolumns = [col for col in tocolumns if col.name in return_columns]
+        bycolumns = [col for col in bycolumns if col.name in return_columns]
     relates_to = _select(*tocolumns).where(_and_(cr.c.concept_id_1 == a.c.concept_id, \
             a.c.vocabulary_id == va.c.vocabulary_id, cr.c.concept_id_2 == d.c.concept_id, \
             d.c.vocabulary_id == vs.c.vocabulary_id, cr.c.relationship_id == rt.c.relationship_id, \
             a.c.concept_id == concept_id))
-    bycolumns = [_literal_column("\'Is related by\'").label('relationship_polarity')] + column
     related_by = _select(*bycolumns).where(_and_(cr.c.concept_id_1 == a.c.concept_id, \
             a.c.vocabulary_id == va.c.vocabulary_id, cr.c.concept_id_2 == d.c.concept_id, \
             d.c.vocabulary_id == vs.c.vocabulary_id, cr.c.relationship_id == rt.c.relationship_id, \
@@ -283,6 +296,7 @@ def related_concepts_for_concept_id(concept_id, inspector, return_columns=None):
     statement = _union_all(relates_to,related_by)
     return statement
 
+@_cached_statement()
 def ancestors_for_concept_id(concept_id, inspector, return_columns=None):
     """
     Find all ancestor concepts for a concept_id.
@@ -338,11 +352,12 @@ def ancestors_for_concept_id(concept_id, inspector, return_columns=None):
                     a.c.ancestor_concept_id == c.c.concept_id,\
                     c.c.vocabulary_id == va.c.vocabulary_id, \
                     a.c.ancestor_concept_id != a.c.descendant_concept_id, \
-                    a.c.descendant_concept_id == concept_id)).\
+                    a.c.descendant_concept_id == _bindparam('concept_id', concept_id))).\
                     order_by(c.c.vocabulary_id, a.c.min_levels_of_separation)
 
     return statement
 
+@_cached_statement()
 def descendants_for_concept_id(concept_id, inspector, return_columns=None):
     """
     Find all descendant concepts for a concept_id.
@@ -399,10 +414,11 @@ def descendants_for_concept_id(concept_id, inspector, return_columns=None):
                     a.c.descendant_concept_id == c.c.concept_id,\
                     c.c.vocabulary_id == va.c.vocabulary_id, \
                     a.c.ancestor_concept_id != a.c.descendant_concept_id, \
-                    a.c.ancestor_concept_id == concept_id)). \
+                    a.c.ancestor_concept_id == _bindparam('concept_id', concept_id))). \
                     order_by(c.c.vocabulary_id, a.c.min_levels_of_separation)
     return statement
 
+@_cached_statement()
 def parents_for_concept_id(concept_id, inspector, return_columns=None):
     """
     Find all parent concepts for a concept_id.  (Ancestors whose level of separation is 1)
@@ -458,7 +474,7 @@ def parents_for_concept_id(concept_id, inspector, return_columns=None):
         columns = [col for col in columns if col.name in return_columns]
     statement = _select(*columns).\
                 where(_and_(\
-                    ca.c.descendant_concept_id == concept_id,\
+                    ca.c.descendant_concept_id == _bindparam('concept_id', concept_id),\
                     ca.c.min_levels_of_separation == levels_of_sep, \
                     ca.c.ancestor_concept_id == a.c.concept_id,\
                     a.c.vocabulary_id == va.c.vocabulary_id,\
@@ -466,6 +482,7 @@ def parents_for_concept_id(concept_id, inspector, return_columns=None):
 
     return statement
 
+@_cached_statement()
 def children_for_concept_id(concept_id, inspector, return_columns=None):
     """
     Find all child concepts for a concept_id.
@@ -518,7 +535,7 @@ def children_for_concept_id(concept_id, inspector, return_columns=None):
         columns = [col for col in columns if col.name in return_columns]
     statement = _select(*columns).\
                 where(_and_(\
-                    ca.c.ancestor_concept_id == concept_id,\
+                    ca.c.ancestor_concept_id == _bindparam('concept_id', concept_id),\
                     ca.c.min_levels_of_separation == levels_of_sep, \
                     ca.c.descendant_concept_id == d.c.concept_id,\
                     d.c.vocabulary_id == vs.c.vocabulary_id))
@@ -526,6 +543,7 @@ def children_for_concept_id(concept_id, inspector, return_columns=None):
     return statement
 
 
+@_cached_statement()
 def siblings_for_concept_id(concept_id, inspector, return_columns=None):
     """
     Find all sibling concepts for a concept_id i.e.(concepts that share common parents).
@@ -541,7 +559,7 @@ def siblings_for_concept_id(concept_id, inspector, return_columns=None):
     return_columns : list of str, optional
         - optional subset of columns to return from the query
         - columns : ['sibling_concept_id', 'sibling_concept_name','sibling_concept_code','sibling_concept_class_id',
-            'sibling_concept_vocabulary_id,'parent_concept_id','parent_concept_name']
+            'sibling_concept_vocabulary_id','parent_concept_id','parent_concept_name']
 
     Returns
     -------
@@ -587,7 +605,7 @@ def siblings_for_concept_id(concept_id, inspector, return_columns=None):
         columns = [col for col in columns if col.name in return_columns]
     statement = _select(*columns).\
                 where(_and_(\
-                    ca.c.descendant_concept_id == concept_id,\
+                    ca.c.descendant_concept_id == _bindparam('concept_id', concept_id),\
                     ca.c.min_levels_of_separation == levels_of_sep, \
                     ca.c.ancestor_concept_id == a.c.concept_id,\
                     a.c.vocabulary_id == va.c.vocabulary_id,\
@@ -596,3 +614,263 @@ def siblings_for_concept_id(concept_id, inspector, return_columns=None):
                     s.c.concept_id == ca2.c.descendant_concept_id)
                     )
     return statement
+
+
+# batched hierarchy queries, the strategy used to pass the concept_ids depends on the number of ids
+_IN_LIST_MAX = 1000
+_VALUES_MAX = 10000
+# dialects that support FROM (VALUES ...) AS name (column)
+_VALUES_DIALECTS = frozenset(['postgresql', 'duckdb', 'mssql'])
+
+def _concept_ids_criterion(key, concept_ids, inspector):
+    """
+    Returns a where criterion matching `key` against a list of concept_ids.
+
+    Up to _IN_LIST_MAX ids are passed as an IN list with bound parameters.  Longer lists are split into chunks of
+    _VALUES_MAX ids, each matched with IN against an inline VALUES list on dialects in _VALUES_DIALECTS and
+    against an inline IN list elsewhere (e.g. SQLite has no column aliases for VALUES, MySQL needs VALUES ROW(...)
+    and Oracle before 23c has no VALUES table constructor), and the chunks are OR'ed together.
+    """
+    concept_ids = sorted(set(int(concept_id) for concept_id in concept_ids))
+    if len(concept_ids) <= _IN_LIST_MAX:
+        return key.in_(concept_ids)
+    chunks = [concept_ids[start:start + _VALUES_MAX] for start in range(0, len(concept_ids), _VALUES_MAX)]
+    if inspector.engine.dialect.name not in _VALUES_DIALECTS:
+        return _or_(*[key.in_(_bindparam('concept_ids_{}'.format(n), chunk, expanding=True, literal_execute=True))
+                      for n, chunk in enumerate(chunks)])
+    criteria = []
+    for n, chunk in enumerate(chunks):
+        ids = _values(_column('concept_id', _BigInteger), name='input_concept_ids_{}'.format(n), literal_binds=True)\
+            .data([(concept_id,) for concept_id in chunk])
+        criteria.append(key.in_(_select(ids.c.concept_id)))
+    return _or_(*criteria)
+
+def ancestors_for_concept_ids(concept_ids, inspector, return_columns=None):
+    """
+    Find all ancestor concepts for many concept_ids with a single query.
+
+    Parameters
+    ----------
+    concept_ids : iterable of int
+        concept_ids of interest from the concept table
+    inspector : inspectomop.inspector.Inspector
+    return_columns : list of str, optional
+        - optional subset of columns to return from the query, the concept_id column is always returned
+        - columns : ['concept_id', 'ancestor_concept_id', 'ancestor_concept_name', 'ancestor_concept_code', 'ancestor_concept_class_id', 'vocabulary_id', 'min_levels_of_separation', 'max_levels_of_separation']
+
+    Returns
+    -------
+    results : sqlalchemy.sql.expression.Executable
+        The concept_id column holds the input concept_id each ancestor belongs to.
+
+    Notes
+    -----
+    Up to 1,000 ids are passed as an IN list with bound parameters.  Longer lists are inlined in chunks of
+    10,000 ids as VALUES lists on PostgreSQL, DuckDB and SQL Server and as IN lists on other dialects, so the
+    statement does not depend on a connection and nothing is written to the database.
+
+    See Also
+    --------
+    ancestors_for_concept_id
+    """
+    a = _alias(inspector.tables['concept_ancestor'],'a')
+    c = _alias(inspector.tables['concept'],'c')
+    va = _alias(inspector.tables['vocabulary'], 'va')
+    columns = [c.c.concept_id.label('ancestor_concept_id'), c.c.concept_name.label('ancestor_concept_name'), c.c.concept_code.label('ancestor_concept_code'), c.c.concept_class_id.label('ancestor_concept_class_id'),\
+               c.c.vocabulary_id, va.c.vocabulary_name, a.c.min_levels_of_separation, \
+               a.c.max_levels_of_separation]
+    if return_columns:
+        columns = [col for col in columns if col.name in return_columns]
+    statement = _select(a.c.descendant_concept_id.label('concept_id'), *columns).\
+                where(_and_(\
+                    a.c.ancestor_concept_id == c.c.concept_id,\
+                    c.c.vocabulary_id == va.c.vocabulary_id, \
+                    a.c.ancestor_concept_id != a.c.descendant_concept_id, \
+                    _concept_ids_criterion(a.c.descendant_concept_id, concept_ids, inspector))).\
+                    order_by(a.c.descendant_concept_id, c.c.vocabulary_id, a.c.min_levels_of_separation)
+    return statement
+
+def descendants_for_concept_ids(concept_ids, inspector, return_columns=None):
+    """
+    Find all descendant concepts for many concept_ids with a single query.
+
+    Parameters
+    ----------
+    concept_ids : iterable of int
+        concept_ids of interest from the concept table
+    inspector : inspectomop.inspector.Inspector
+    return_columns : list of str, optional
+        - optional subset of columns to return from the query, the concept_id column is always returned
+        - columns : ['concept_id', 'descendant_concept_id', 'descendant_concept_name', 'descendant_concept_code', 'descendant_concept_class_id', 'vocabulary_id', 'min_levels_of_separation', 'max_levels_of_separation']
+
+    Returns
+    -------
+    results : sqlalchemy.sql.expression.Executable
+        The concept_id column holds the input concept_id each descendant belongs to.
+
+    Notes
+    -----
+    See ancestors_for_concept_ids for how the concept_ids are passed to the database.
+
+    See Also
+    --------
+    descendants_for_concept_id
+    """
+    a = _alias(inspector.tables['concept_ancestor'],'a')
+    c = _alias(inspector.tables['concept'],'c')
+    va = _alias(inspector.tables['vocabulary'], 'va')
+    columns = [c.c.concept_id.label('descendant_concept_id'), c.c.concept_name.label('descendant_concept_name'), c.c.concept_code.label('descendant_concept_code'), c.c.concept_class_id.label('descendant_concept_class_id'),\
+               c.c.vocabulary_id, va.c.vocabulary_name, a.c.min_levels_of_separation, \
+               a.c.max_levels_of_separation]
+    if return_columns:
+        columns = [col for col in columns if col.name in return_columns]
+    statement = _select(a.c.ancestor_concept_id.label('concept_id'), *columns).\
+                where(_and_(\
+                    a.c.descendant_concept_id == c.c.concept_id,\
+                    c.c.vocabulary_id == va.c.vocabulary_id, \
+                    a.c.ancestor_concept_id != a.c.descendant_concept_id, \
+                    _concept_ids_criterion(a.c.ancestor_concept_id, concept_ids, inspector))).\
+                    order_by(a.c.ancestor_concept_id, c.c.vocabulary_id, a.c.min_levels_of_separation)
+    return statement
+
+def parents_for_concept_ids(concept_ids, inspector, return_columns=None):
+    """
+    Find all parent concepts for many concept_ids with a single query.  (Ancestors whose level of separation is 1)
+
+    Parameters
+    ----------
+    concept_ids : iterable of int
+        concept_ids of interest from the concept table
+    inspector : inspectomop.inspector.Inspector
+    return_columns : list of str, optional
+        - optional subset of columns to return from the query, the concept_id column is always returned
+        - columns : ['concept_id', 'parent_concept_id', 'parent_concept_name', 'parent_concept_code', 'parent_concept_class_id', 'parent_concept_vocabulary_id', 'parent_concept_vocab_name']
+
+    Returns
+    -------
+    results : sqlalchemy.sql.expression.Executable
+        The concept_id column holds the input concept_id each parent belongs to.
+
+    Notes
+    -----
+    See ancestors_for_concept_ids for how the concept_ids are passed to the database.
+
+    See Also
+    --------
+    parents_for_concept_id
+    """
+    ca = _alias(inspector.tables['concept_ancestor'],'ca')
+    a = _alias(inspector.tables['concept'],'a')
+    d = _alias(inspector.tables['concept'], 'd')
+    va = _alias(inspector.tables['vocabulary'], 'va')
+    levels_of_sep = 1
+
+    columns = [a.c.concept_id.label('parent_concept_id'), a.c.concept_name.label('parent_concept_name'), a.c.concept_code.label('parent_concept_code'), a.c.concept_class_id.label('parent_concept_class_id'),\
+               a.c.vocabulary_id.label('parent_concept_vocabulary_id'), va.c.vocabulary_name.label('parent_concept_vocab_name')]
+    if return_columns:
+        columns = [col for col in columns if col.name in return_columns]
+    statement = _select(ca.c.descendant_concept_id.label('concept_id'), *columns).\
+                where(_and_(\
+                    _concept_ids_criterion(ca.c.descendant_concept_id, concept_ids, inspector),\
+                    ca.c.min_levels_of_separation == levels_of_sep, \
+                    ca.c.ancestor_concept_id == a.c.concept_id,\
+                    a.c.vocabulary_id == va.c.vocabulary_id,\
+                    ca.c.descendant_concept_id == d.c.concept_id)).\
+                    order_by(ca.c.descendant_concept_id)
+    return statement
+
+def children_for_concept_ids(concept_ids, inspector, return_columns=None):
+    """
+    Find all child concepts for many concept_ids with a single query.
+
+    Parameters
+    ----------
+    concept_ids : iterable of int
+        concept_ids of interest from the concept table
+    inspector : inspectomop.inspector.Inspector
+    return_columns : list of str, optional
+        - optional subset of columns to return from the query, the concept_id column is always returned
+        - columns : ['concept_id', 'child_concept_id','child_concept_name', 'child_concept_code', 'child_concept_class_id', 'child_concept_vocabulary_id', 'child_concept_vocab_name']
+
+    Returns
+    -------
+    results : sqlalchemy.sql.expression.Executable
+        The concept_id column holds the input concept_id each child belongs to.
+
+    Notes
+    -----
+    See ancestors_for_concept_ids for how the concept_ids are passed to the database.
+
+    See Also
+    --------
+    children_for_concept_id
+    """
+    ca = _alias(inspector.tables['concept_ancestor'],'ca')
+    d = _alias(inspector.tables['concept'], 'd')
+    vs = _alias(inspector.tables['vocabulary'], 'vs')
+    levels_of_sep = 1
+
+    columns = [d.c.concept_id.label('child_concept_id'), d.c.concept_name.label('child_concept_name'), d.c.concept_code.label('child_concept_code'), d.c.concept_class_id.label('child_concept_class_id'),\
+               d.c.vocabulary_id.label('child_concept_vocabulary_id'), vs.c.vocabulary_name.label('child_concept_vocab_name')]
+    if return_columns:
+        columns = [col for col in columns if col.name in return_columns]
+    statement = _select(ca.c.ancestor_concept_id.label('concept_id'), *columns).\
+                where(_and_(\
+                    _concept_ids_criterion(ca.c.ancestor_concept_id, concept_ids, inspector),\
+                    ca.c.min_levels_of_separation == levels_of_sep, \
+                    ca.c.descendant_concept_id == d.c.concept_id,\
+                    d.c.vocabulary_id == vs.c.vocabulary_id)).\
+                    order_by(ca.c.ancestor_concept_id)
+    return statement
+
+def siblings_for_concept_ids(concept_ids, inspector, return_columns=None):
+    """
+    Find all sibling concepts for many concept_ids with a single query i.e.(concepts that share common parents).
+
+    Parameters
+    ----------
+    concept_ids : iterable of int
+        concept_ids of interest from the concept table
+    inspector : inspectomop.inspector.Inspector
+    return_columns : list of str, optional
+        - optional subset of columns to return from the query, the concept_id column is always returned
+        - columns : ['concept_id', 'sibling_concept_id', 'sibling_concept_name','sibling_concept_code','sibling_concept_class_id',
+            'sibling_concept_vocabulary_id','parent_concept_id','parent_concept_name']
+
+    Returns
+    -------
+    results : sqlalchemy.sql.expression.Executable
+        The concept_id column holds the input concept_id each sibling belongs to.
+
+    Notes
+    -----
+    See ancestors_for_concept_ids for how the concept_ids are passed to the database.
+
+    See Also
+    --------
+    siblings_for_concept_id
+    """
+    ca = _alias(inspector.tables['concept_ancestor'],'ca')
+    ca2 = _alias(inspector.tables['concept_ancestor'], 'ca2')
+    a = _alias(inspector.tables['concept'],'a')
+    d = _alias(inspector.tables['concept'], 'd')
+    s = _alias(inspector.tables['concept'], 's')
+    va = _alias(inspector.tables['vocabulary'], 'va')
+    levels_of_sep = 1
+
+    columns = [s.c.concept_id.label('sibling_concept_id'), s.c.concept_name.label('sibling_concept_name'),\
+        s.c.concept_code.label('sibling_concept_code'),s.c.concept_class_id.label('sibling_concept_class_id'),\
+        s.c.vocabulary_id.label('sibling_concept_vocabulary_id'),a.c.concept_id.label('parent_concept_id'), a.c.concept_name.label('parent_concept_name')]
+    if return_columns:
+        columns = [col for col in columns if col.name in return_columns]
+    statement = _select(ca.c.descendant_concept_id.label('concept_id'), *columns).\
+                where(_and_(\
+                    _concept_ids_criterion(ca.c.descendant_concept_id, concept_ids, inspector),\
+                    ca.c.min_levels_of_separation == levels_of_sep, \
+                    ca.c.ancestor_concept_id == a.c.concept_id,\
+                    a.c.vocabulary_id == va.c.vocabulary_id,\
+                    ca.c.descendant_concept_id == d.c.concept_id,\
+                    ca2.c.ancestor_concept_id == ca.c.ancestor_concept_id,\
+                    s.c.concept_id == ca2.c.descendant_concept_id)).\
+                    order_by(ca.c.descendant_concept_id)
+    return statement
@@ -8,6 +8,11 @@ from sqlalchemy import select as _select, join as _join,\
     distinct as _distinct, between as  _between, alias as _alias, \
     and_ as _and_, or_ as _or_, literal_column as _literal_column, func as _func
 
+from ..cache import cached_statement as _cached_statement
+from ..search import keyword_criterion as _keyword_criterion, keyword_variant as _keyword_variant, \
+    keyword_params as _keyword_params
+
+@_cached_statement(variant=_keyword_variant, params=_keyword_params)
 def observation_concepts_for_keyword(keyword, inspector,return_columns=None):
     """
     Search for LOINC and UCUM concepts by keyword.
@@ -83,6 +88,6 @@ def observation_concepts_for_keyword(keyword, inspector,return_columns=None):
     if return_columns:
         columns = [col for col in columns if col.name in return_columns]
     statement = _select(*columns).select_from(s1).\
-        where(_func.lower(s1.c.concept_name).ilike('%{}%'.format(keyword.lower())))
+        where(_keyword_criterion(keyword, s1.c.concept_name, s1.c.concept_id, inspector))
 
     return statement
@@ -8,7 +8,7 @@ from sqlalchemy import select as _select, join as _join,\
     distinct as _distinct, between as  _between, alias as _alias, \
     and_ as _and_, or_ as _or_, literal_column as _literal_column, func as _func
 
-import pandas as _pd, numpy as _np
+from ..cache import cached_statement as _cached_statement
 
 def counts_by_years_of_coverage(inspector):
     """
@@ -38,6 +38,8 @@ def counts_by_years_of_coverage(inspector):
             floor((p.payer_plan_period_end_date - p.payer_plan_period_start_date)/365)
     	ORDER BY 1;
     """
+    import pandas as _pd, numpy as _np
+
     p = _alias(inspector.tables['payer_plan_period'], 'p')
 
     columns = [p.c.payer_plan_period_end_date,p.c.payer_plan_period_start_date]
@@ -51,6 +53,7 @@ def counts_by_years_of_coverage(inspector):
     return results
 
 
+@_cached_statement()
 def patient_distribution_by_plan_type(inspector):
     """
     Returns counts of payer coverage by plan type.
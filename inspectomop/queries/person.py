@@ -7,10 +7,17 @@ Adapted from: https://github.com/OHDSI/OMOP-Queries
 from sqlalchemy import select as _select, join as _join,\
     union as _union, union_all as _union_all, \
     distinct as _distinct, between as  _between, alias as _alias, \
-    and_ as _and_, or_ as _or_, literal_column as _literal_column, func as _func
+    and_ as _and_, or_ as _or_, literal_column as _literal_column, func as _func, bindparam as _bindparam
 
-import pandas as _pd
+from ..cache import cached_statement as _cached_statement
 
+
+def _has_person_ids(inspector, person_ids):
+    # the statement only filters on person_id when person_ids are given
+    return bool(person_ids)
+
+
+@_cached_statement(variant=_has_person_ids)
 def patient_counts_by_gender(inspector, person_ids=None, return_columns=None):
     """
     Returns patient counts grouped by gender for the database or alternativily, for a supplied list of person_ids.
@@ -58,11 +65,12 @@ def patient_counts_by_gender(inspector, person_ids=None, return_columns=None):
         statement = _select(*columns).\
                     where(_and_(\
                         p.c.gender_concept_id == c.c.concept_id,\
-                        p.c.person_id.in_(person_ids))).\
+                        p.c.person_id.in_(_bindparam('person_ids', person_ids, expanding=True)))).\
                     group_by(p.c.gender_concept_id)
 
     return statement
 
+@_cached_statement(variant=_has_person_ids)
 def patient_counts_by_year_of_birth(inspector, person_ids=None, return_columns=None):
     """
     Returns patient counts grouped by year of birth for the database or alternativily, for a supplied list of person_ids.
@@ -108,11 +116,12 @@ def patient_counts_by_year_of_birth(inspector, person_ids=None, return_columns=N
     else:
         statement = _select(*columns).\
                     where(\
-                        p.c.person_id.in_(person_ids)).\
+                        p.c.person_id.in_(_bindparam('person_ids', person_ids, expanding=True))).\
                     group_by(p.c.year_of_birth).\
                     order_by(p.c.year_of_birth)
     return statement
 
+@_cached_statement(variant=_has_person_ids)
 def patient_counts_by_residence_state(inspector, person_ids=None, return_columns=None):
     """
     Returns patient counts grouped by state for the database or alternativily, for a supplied list of person_ids.
@@ -162,11 +171,12 @@ def patient_counts_by_residence_state(inspector, person_ids=None, return_columns
         statement = _select(*columns).\
                     select_from(j).\
                     where(\
-                        j.c.p_person_id.in_(person_ids)).\
+                        j.c.p_person_id.in_(_bindparam('person_ids', person_ids, expanding=True))).\
                     group_by(j.c.l_state).\
                     order_by(j.c.l_state)
     return statement
 
+@_cached_statement(variant=_has_person_ids)
 def patient_counts_by_zip_code(inspector, person_ids=None, return_columns=None):
     """
     Returns patient counts grouped by zip code for the database or alternativily, for a supplied list of person_ids.
@@ -219,11 +229,12 @@ def patient_counts_by_zip_code(inspector, person_ids=None, return_columns=None):
         statement = _select(*columns).\
                     select_from(j).\
                     where(\
-                        j.c.p_person_id.in_(person_ids)).\
+                        j.c.p_person_id.in_(_bindparam('person_ids', person_ids, expanding=True))).\
                     group_by(j.c.l_state, j.c.l_zip).\
                     order_by(j.c.l_state, j.c.l_zip)
     return statement
 
+@_cached_statement(variant=_has_person_ids)
 def patient_counts_by_year_of_birth_and_gender(inspector, person_ids=None, return_columns=None):
     """
     Returns patient counts stratified by year of birth and gender for the database or alternativily, for a supplied list of person_ids.
@@ -278,7 +289,7 @@ def patient_counts_by_year_of_birth_and_gender(inspector, person_ids=None, retur
     else:
         statement = _select(*columns).\
                     where(_and_(\
-                        p.c.person_id.in_(person_ids),\
+                        p.c.person_id.in_(_bindparam('person_ids', person_ids, expanding=True)),\
                         c.c.concept_id == p.c.gender_concept_id)).\
                     group_by(p.c.year_of_birth, c.c.concept_name).\
                     order_by(p.c.year_of_birth, c.c.concept_name)
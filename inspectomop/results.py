@@ -1,163 +1,637 @@
 from datetime import date as _date, datetime as _datetime
+from importlib.util import find_spec as _find_spec
  
-from sqlalchemy.engine.cursor import CursorResult as _CursorResult
-import pandas as _pd
+from sqlalchemy.engine.cursor import CursorFetchStrategy as _CursorFetchStrategy
+from sqlalchemy.sql import sqltypes as _sqltypes
 
-class Results(_CursorResult):
+
+def _import_pyarrow():
+    try:
+        import pyarrow as _pa
+    except ImportError:
+        raise ImportError('pyarrow is required for Arrow results, install it with "pip install inspectomop[arrow]"') from None
+    return _pa
+
+# OMOP columns holding a small set of repeated codes, returned as pandas Categoricals with categorical=True
+_CATEGORICAL_COLUMNS = frozenset(['vocabulary_id', 'concept_class_id', 'domain_id', 'standard_concept', 'invalid_reason',
+    'relationship_id', 'relationship_polarity', 'is_hierarchical', 'defines_ancestry', 'source_vocabulary_id',
+    'target_vocabulary_id', 'vocabulary_name', 'domain_name', 'concept_class_name', 'relationship_name',
+    'gender_source_value', 'race_source_value', 'ethnicity_source_value'])
+
+
+def _pandas_dtype(sqltype):
+    # pandas dtype for a sqlalchemy column type or None if it has to be inferred from the values
+    if isinstance(sqltype, (_sqltypes.Date, _sqltypes.DateTime)):
+        return 'datetime64[ns]'
+    if isinstance(sqltype, _sqltypes.Boolean):
+        return 'boolean'
+    if isinstance(sqltype, _sqltypes.Integer):
+        return 'Int64' # nullable so NULLs in one chunk do not turn the column into floats
+    if isinstance(sqltype, _sqltypes.Numeric): # includes Float
+        return 'float64'
+    if isinstance(sqltype, _sqltypes.String):
+        return 'object'
+    return None
+
+
+def _arrow_to_pandas(arrow):
+    # converts an Arrow table or record batch with the dtypes of _pandas_dtype, rather than pyarrow's defaults
+    # of int64 or float64 (depending on NULLs) for integers and datetime64 with the unit of the Arrow type
+    import pandas as _pd
+    import pyarrow as _pa
+
+    if isinstance(arrow, _pa.RecordBatch):
+        arrow = _pa.Table.from_batches([arrow])
+    fields = []
+    for field in arrow.schema:
+        if _pa.types.is_date(field.type):
+            field = field.with_type(_pa.timestamp('ns'))
+        elif _pa.types.is_timestamp(field.type):
+            field = field.with_type(_pa.timestamp('ns', tz=field.type.tz))
+        elif _pa.types.is_decimal(field.type):
+            field = field.with_type(_pa.float64())
+        fields.append(field)
+
+    def types_mapper(arrow_type):
+        if _pa.types.is_integer(arrow_type):
+            return _pd.Int64Dtype()
+        if _pa.types.is_boolean(arrow_type):
+            return _pd.BooleanDtype()
+        return None
+    return arrow.cast(_pa.schema(fields)).to_pandas(types_mapper=types_mapper)
+
+
+def _arrow_type(sqltype):
+    # pyarrow type for a sqlalchemy column type or None if it has to be inferred from the values
+    import pyarrow as _pa
+
+    if isinstance(sqltype, _sqltypes.DateTime):
+        return _pa.timestamp('us')
+    if isinstance(sqltype, _sqltypes.Date):
+        return _pa.date32()
+    if isinstance(sqltype, _sqltypes.Boolean):
+        return _pa.bool_()
+    if isinstance(sqltype, _sqltypes.Integer):
+        return _pa.int64()
+    if isinstance(sqltype, _sqltypes.Numeric):
+        return _pa.float64()
+    if isinstance(sqltype, _sqltypes.String):
+        return _pa.string()
+    return None
+
+
+def _numpy_dtype(sqltype):
+    # numpy dtype for a sqlalchemy column type or None if it has to be inferred from the values
+    if isinstance(sqltype, _sqltypes.DateTime):
+        return 'datetime64[us]'
+    if isinstance(sqltype, _sqltypes.Date):
+        return 'datetime64[D]'
+    if isinstance(sqltype, _sqltypes.Boolean):
+        return 'bool'
+    if isinstance(sqltype, _sqltypes.Integer):
+        return 'int64'
+    if isinstance(sqltype, _sqltypes.Numeric):
+        return 'float64'
+    if isinstance(sqltype, _sqltypes.String):
+        return 'object'
+    return None
+
+
+def _numpy_dtype_for_value(value):
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int64'
+    if isinstance(value, float):
+        return 'float64'
+    if isinstance(value, _datetime):
+        return 'datetime64[us]'
+    if isinstance(value, _date):
+        return 'datetime64[D]'
+    return 'object'
+
+
+def _numpy_column(array, dtype):
+    # returns the typed array and a mask of NULLs for dtypes without a missing value marker (ints and bools)
+    import numpy as _np
+
+    if dtype == 'object' or dtype is None:
+        return array, None
+    try:
+        if dtype.startswith('datetime64'):
+            return array.astype(dtype), None # NULLs become NaT
+        nulls = _np.equal(array, None)
+        if not nulls.any():
+            return array.astype(dtype), None
+        if dtype == 'float64':
+            return _np.where(nulls, _np.nan, array).astype(dtype), None
+        return _np.where(nulls, 0, array).astype(dtype), nulls
+    except (TypeError, ValueError):
+        return array, None # values that do not match the declared type, e.g. SQLite's dynamic typing
+
+
+def _convert_column(array, dtype):
+    import pandas as _pd
+
+    if dtype == 'datetime64[ns]':
+        return _pd.to_datetime(_pd.Series(array, copy=False))
+    if dtype == 'object':
+        return _pd.Series(array, copy=False)
+    try:
+        if dtype in ('Int64', 'boolean'):
+            return _pd.Series(_pd.array(array, dtype=dtype), copy=False)
+        if dtype == 'float64':
+            return _pd.Series(array, copy=False).astype(dtype)
+    except (TypeError, ValueError):
+        pass # values that do not match the declared type, e.g. SQLite's dynamic typing
+    return _pd.Series(array, copy=False).infer_objects()
+
+
+def _column_array(rows, i):
+    import numpy as _np
+
+    return _np.fromiter((row[i] for row in rows), dtype=object, count=len(rows))
+
+
+def _column_arrays(rows, n_columns):
+    return [_column_array(rows, i) for i in range(n_columns)]
+
+
+class Results():
     """
     A cursor-like object with methods such as `fetchone`, `fetchmany` etc. that can be 
     used to retrieve rows of results from query execution.
 
-    A subclass of sqlalchemy.engine.CursorResult
-    that adds additional methods for retrieving query results as Pandas DataFrames.
+    Wraps a sqlalchemy.engine.CursorResult and adds additional methods for retrieving query results as
+    Pandas DataFrames, Arrow tables and Parquet files.  All other CursorResult methods and attributes
+    (`fetchone`, `fetchmany`, `partitions`, `keys`, `rowcount`, iteration, ...) are available unchanged.
+    Results wraps rather than subclasses CursorResult, so ``isinstance(results, CursorResult)`` is False.
 
     See Also
     --------
-    Results.as_pandas, Results.as_pandas_chunks
+    Results.as_pandas, Results.as_pandas_chunks, Results.as_arrow, Results.as_arrow_batches
     """
+    # the row fetching methods are bound methods of the CursorResult stored on the instance so that calls
+    # in tight loops go straight to sqlalchemy, everything else is looked up through __getattr__
+    __slots__ = ('__cursor_result', '__dtypes', '__numpy_dtypes', '__categories', 'fetchone', 'fetchmany', 'fetchall', 'partitions',
+        'keys', 'close', 'all', 'first', 'one', 'scalar', 'scalars', 'mappings')
+
     def __init__(self, cursor_result):
         self.__cursor_result = cursor_result
+        self.__dtypes = None
+        self.__numpy_dtypes = None
+        self.__categories = None
+        self.fetchone = cursor_result.fetchone
+        self.fetchmany = cursor_result.fetchmany
+        self.fetchall = cursor_result.fetchall
+        self.partitions = cursor_result.partitions
+        self.keys = cursor_result.keys
+        self.close = cursor_result.close
+        self.all = cursor_result.all
+        self.first = cursor_result.first
+        self.one = cursor_result.one
+        self.scalar = cursor_result.scalar
+        self.scalars = cursor_result.scalars
+        self.mappings = cursor_result.mappings
+
+    def __getattr__(self, name):
+        # only called for names that are not found on Results itself.  The slot is read with object.__getattribute__
+        # so that an unset slot (e.g. while copy.copy builds a new instance) raises AttributeError instead of
+        # calling __getattr__ again
+        if name.startswith('__') and name.endswith('__'):
+            raise AttributeError(name)
+        return getattr(object.__getattribute__(self, '_Results__cursor_result'), name)
+
+    def __iter__(self):
+        return iter(self.__cursor_result)
+
+    def __next__(self):
+        return next(self.__cursor_result)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value, traceback):
+        self.close()
 
-    def __getattribute__(self,name):
-        if name == '__cursor_result':
-            return self.__cursor_result
-        else:
-            return super().__getattribute__(name)
-
-    #CursorResult methods
-    def all(self):
-        return self.__cursor_result.all()
-    
-    def close(self):
-        return self.__cursor_result.close()
-    
-    def columns(self, *col_expressions):
-        return self.__cursor_result.columns(*col_expressions)
-    
-    def fetchall(self):
-        return self.__cursor_result.fetchall()
-    
-    def fetchmany(self, size=None):
-        return self.__cursor_result.fetchmany(size)
-
-    def fetchone(self):
-        return self.__cursor_result.fetchone()
-    
-    def first(self):
-        return self.__cursor_result.first()
-    
-    def freeze(self):
-        return self.__cursor_result.freeze()
-    
-    def keys(self):
-        return self.__cursor_result.keys()
-    
-    def last_inserted_params(self):
-        return self.__cursor_result.last_inserted_params()
-
-    def last_updated_params(self):
-        return self.__cursor_result.last_updated_params()
-     
-    def mappings(self):
-        return self.__cursor_result.mappings()
-        
-    def merge(self, *others):
-        return self.__cursor_result.merge(*others)
-    
-    def one(self):
-        return self.__cursor_result.one()
-    
     def one_or_non(self):
+        # misspelled name kept for backwards compatibility, see one_or_none
         return self.__cursor_result.one_or_none()
-    
-    def partitions(self, size = None):
-        return self.__cursor_result.partitions(size)
-    
-    def postfetch_cols(self):
-        return self.__cursor_result.postfetch_cols()
-    
-    def prefetch_cols(self):
-        return self.__cursor_result.prefetch_cols()
-        
-    def scalar(self):
-        return self.__cursor_result.scalar()
-    
-    def scalar_one(self):
-        return self.__cursor_result.scalar_one()
-    
-    def scalar_one_or_none(self):
-        return self.__cursor_result.scalar_one_or_none()
-    
-    def scalars(self):
-        return self.__cursor_result.scalars()
-    
-    def splice_horizontally(self, other):
-        return self.__cursor_result.splice_horizontally(other)
-    
-    def splice_vertically(self, other):
-        return self.__cursor_result.splice_vertically(other)
-    
-    def supports_sane_multi_rowcount(self):
-        return self.__cursor_result.supports_sane_multi_rowcount()
-    
-    def supports_sane_rowcount(self):
-        return self.__cursor_result.supports_sane_rowcount()
-    
-    def tuples(self):
-        return self.__cursor_result.tuples()
-        
-    def unique(self, strategy = None):
-        return self.__cursor_result.unique(strategy)
-    
-    def yield_per(self, num):
-        return self.__cursor_result.yield_per(num)
-
-    #subclass methods
-    def _convert_dates(self, df):
-        if df.empty:
+
+    def _native_arrow_cursor(self):
+        # the DBAPI cursor if the driver can export Arrow itself (DuckDB, ADBC) and no rows were buffered by sqlalchemy
+        cursor_result = self.__cursor_result
+        if type(cursor_result.cursor_strategy) is not _CursorFetchStrategy:
+            return None
+        cursor = cursor_result.cursor
+        if hasattr(cursor, 'to_arrow_table') or hasattr(cursor, 'fetch_arrow_table'):
+            return cursor
+        return None
+
+    def _column_types(self):
+        # sqlalchemy types of the result columns taken from the executed statement, None where unknown (e.g. raw SQL)
+        n_columns = len(self.keys())
+        compiled = getattr(self.__cursor_result.context, 'compiled', None)
+        selected_columns = getattr(getattr(compiled, 'statement', None), 'selected_columns', None)
+        if selected_columns is None or len(selected_columns) != n_columns:
+            return [None] * n_columns
+        return [column.type for column in selected_columns]
+
+    def _arrow_schema(self):
+        pa = _import_pyarrow()
+        return pa.schema([(name, _arrow_type(sqltype) or pa.null())
+                          for name, sqltype in zip(self.keys(), self._column_types())])
+
+    def _arrow_record_batches(self, batch_size):
+        pa = _import_pyarrow()
+        cursor = self._native_arrow_cursor()
+        if cursor is not None:
+            if hasattr(cursor, 'to_arrow_reader'):
+                reader = cursor.to_arrow_reader(batch_size)
+            elif hasattr(cursor, 'fetch_record_batch'):
+                try:
+                    reader = cursor.fetch_record_batch(batch_size) # DuckDB
+                except TypeError:
+                    reader = cursor.fetch_record_batch() # ADBC, batch size is chosen by the driver
+            else:
+                reader = cursor.fetch_arrow_table().to_reader(batch_size)
+            for batch in reader:
+                for offset in range(0, batch.num_rows, batch_size):
+                    yield batch.slice(offset, batch_size)
+            return
+
+        # column-wise fallback, rows are transposed into one Arrow array per column
+        columns = list(self.keys())
+        types = [_arrow_type(sqltype) for sqltype in self._column_types()]
+        while True:
+            rows = self.fetchmany(batch_size)
+            if not rows:
+                break
+            arrays = []
+            for i, values in enumerate(zip(*rows)):
+                try:
+                    array = pa.array(values, type=types[i])
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    if types[i] is None:
+                        raise
+                    array = pa.array(values).cast(types[i]) # e.g. Decimals of a Numeric column to float64
+                if types[i] is None and not pa.types.is_null(array.type):
+                    types[i] = array.type
+                arrays.append(array)
+            yield pa.RecordBatch.from_arrays(arrays, names=columns)
+
+    def as_arrow(self):
+        """
+        Return all rows from a `results` object as a pyarrow Table
+
+        Drivers with a native Arrow export (e.g. DuckDB and ADBC drivers) hand over their Arrow data
+        directly, other drivers build the table column by column.  Requires pyarrow.
+
+        Returns
+        -------
+        results : pyarrow.Table
+
+        See also
+        --------
+        as_arrow_batches, as_pandas
+        """
+        pa = _import_pyarrow()
+        cursor = self._native_arrow_cursor()
+        if cursor is not None:
+            table = cursor.to_arrow_table() if hasattr(cursor, 'to_arrow_table') else cursor.fetch_arrow_table()
+            self.close()
+            return table
+        tables = [pa.Table.from_batches([batch]) for batch in self._arrow_record_batches(65536)]
+        if not tables:
+            return self._arrow_schema().empty_table()
+        # columns that only held NULLs in the first batches are promoted to the type found later on
+        return pa.concat_tables(tables, promote_options='default')
+
+    def as_arrow_batches(self, batch_size):
+        """
+        Yields pyarrow RecordBatches of at most `batch_size` rows
+
+        Parameters
+        ----------
+        batch_size : int
+            maximum number of rows in each batch
+
+        Notes
+        -----
+        Drivers with a native Arrow export may yield smaller batches than `batch_size`.
+        Requires pyarrow.
+
+        See also
+        --------
+        as_arrow, as_pandas_chunks
+        """
+        for batch in self._arrow_record_batches(batch_size):
+            yield batch
+        self.close()
+
+    def _fetch_column_arrays(self, fetch_size=10000):
+        # streams rows from the cursor into one object array per column so only fetch_size Row objects are alive at once
+        import numpy as _np
+
+        n_columns = len(self.keys())
+        try:
+            rowcount = self.__cursor_result.rowcount
+        except Exception:
+            rowcount = -1
+        if rowcount is not None and rowcount > 0:
+            # drivers that buffer the result client side (e.g. psycopg2) report the row count up front
+            arrays = [_np.empty(rowcount, dtype=object) for _ in range(n_columns)]
+            n_rows = 0
+            while n_rows < rowcount:
+                rows = self.fetchmany(min(fetch_size, rowcount - n_rows))
+                if not rows:
+                    break
+                for i, array in enumerate(arrays):
+                    array[n_rows:n_rows + len(rows)] = _column_array(rows, i)
+                n_rows += len(rows)
+            arrays = [array[:n_rows] for array in arrays]
+            rest = [arrays] + [_column_arrays(rows, n_columns) for rows in self.partitions(fetch_size)]
+        else:
+            rest = [_column_arrays(rows, n_columns) for rows in self.partitions(fetch_size)]
+        if len(rest) == 1:
+            return rest[0]
+        if not rest:
+            return [_np.empty(0, dtype=object) for _ in range(n_columns)]
+        return [_np.concatenate(chunks) for chunks in zip(*rest)]
+
+    def _pandas_dtypes(self, arrays):
+        # dtypes are looked up from the statement's column types once per result so every chunk gets the same dtypes
+        dtypes = self.__dtypes
+        if dtypes is None:
+            dtypes = self.__dtypes = [_pandas_dtype(sqltype) for sqltype in self._column_types()]
+        # raw SQL and untyped expressions, date columns are recognised by their first non-NULL value
+        for i, dtype in enumerate(dtypes):
+            if dtype is None:
+                value = next((value for value in arrays[i] if value is not None), None)
+                if isinstance(value, (_date, _datetime)):
+                    dtypes[i] = 'datetime64[ns]'
+                elif value is not None:
+                    dtypes[i] = 'infer'
+        return dtypes
+
+    def _numpy_from_columns(self, arrays, structured):
+        import numpy as _np
+
+        names = list(self.keys())
+        if len(set(names)) != len(names):
+            raise ValueError('Column names must be unique for NumPy output, use labels for duplicate columns: {}'.format(names))
+        dtypes = self.__numpy_dtypes
+        if dtypes is None:
+            dtypes = self.__numpy_dtypes = [_numpy_dtype(sqltype) for sqltype in self._column_types()]
+        for i, dtype in enumerate(dtypes):
+            if dtype is None:
+                # untyped columns take the type of their first non-NULL value, once per result
+                value = next((value for value in arrays[i] if value is not None), None)
+                if value is not None:
+                    dtypes[i] = _numpy_dtype_for_value(value)
+        columns = [_numpy_column(array, dtype) for array, dtype in zip(arrays, dtypes)]
+        if not structured:
+            return {name: values if mask is None else _np.ma.MaskedArray(values, mask=mask)
+                    for name, (values, mask) in zip(names, columns)}
+
+        n_rows = len(arrays[0]) if arrays else 0
+        data = _np.empty(n_rows, dtype=[(name, values.dtype) for name, (values, _) in zip(names, columns)])
+        for name, (values, _) in zip(names, columns):
+            data[name] = values
+        if all(mask is None for _, mask in columns):
+            return data
+        masks = _np.zeros(n_rows, dtype=[(name, bool) for name in names])
+        for name, (_, mask) in zip(names, columns):
+            if mask is not None:
+                masks[name] = mask
+        return _np.ma.MaskedArray(data, mask=masks)
+
+    def as_numpy(self, structured=False):
+        """
+        Return all rows from a `results` object as NumPy arrays
+
+        Parameters
+        ----------
+        structured : bool, default False
+            If False, return a dict of 1-D arrays keyed by column name.  If True, return a single structured array.
+
+        Returns
+        -------
+        results : dict of numpy.ndarray or numpy.ndarray
+
+        Notes
+        -----
+        Dtypes follow the column types of the statement: integers become int64, dates datetime64[D],
+        datetimes datetime64[us], numerics float64, booleans bool and strings object.  Columns without a known
+        type take the type of their first non-NULL value.  NULL dates are NaT and NULL numerics NaN.
+        Integer and boolean columns that contain NULLs are returned as numpy.ma.MaskedArray with the NULLs masked.
+        Column names must be unique.
+
+        See also
+        --------
+        as_numpy_chunks, as_pandas
+        """
+        return self._numpy_from_columns(self._fetch_column_arrays(), structured)
+
+    def as_numpy_chunks(self, chunksize=None, structured=False):
+        """
+        Yields NumPy arrays of chunksize rows, see `as_numpy`
+
+        Parameters
+        ----------
+        chunksize : int, optional
+            number of rows in each chunk.  Defaults to the chunksize passed to Connection.execute.
+        structured : bool, default False
+            If False, yield dicts of 1-D arrays keyed by column name.  If True, yield structured arrays.
+
+        Notes
+        -----
+        The dtypes are determined once per result so every chunk has the same dtypes.
+
+        See also
+        --------
+        as_numpy, as_pandas_chunks
+        """
+        return self._numpy_chunks(self._chunksize(chunksize), structured)
+
+    def _chunksize(self, chunksize):
+        # chunked readers default to the chunksize the statement was executed with, see Connection.execute
+        if chunksize is None:
+            chunksize = self.__cursor_result.context.execution_options.get('yield_per')
+            if chunksize is None:
+                raise ValueError('A chunksize must be given unless the statement was executed with a chunksize')
+        return chunksize
+
+    def _numpy_chunks(self, chunksize, structured):
+        n_columns = len(self.keys())
+        for rows in self.partitions(chunksize):
+            yield self._numpy_from_columns(_column_arrays(rows, n_columns), structured)
+
+    def _frame_from_columns(self, arrays):
+        import pandas as _pd
+
+        dtypes = self._pandas_dtypes(arrays)
+        # columns are keyed by position first since result keys are not necessarily unique
+        df = _pd.DataFrame({i: _convert_column(array, dtype) for i, (array, dtype) in enumerate(zip(arrays, dtypes))},
+                           copy=False)
+        df.columns = list(self.keys())
+        return df
+
+    def to_parquet(self, path, row_group_size=100000, partition_cols=None, compression='snappy', use_dictionary=True):
+        """
+        Writes all rows from a `results` object to Parquet, streaming one row group at a time
+
+        Parameters
+        ----------
+        path : str
+            file to write or, if `partition_cols` is given, the root directory of a hive partitioned dataset
+        row_group_size : int, default 100000
+            number of rows fetched and written per row group
+        partition_cols : list of str, optional
+            columns to partition the dataset by, e.g. ['vocabulary_id']
+        compression : str, default 'snappy'
+            Parquet compression codec, e.g. 'snappy', 'zstd', 'gzip' or 'none'
+        use_dictionary : bool or list of str, default True
+            If True, low-cardinality OMOP code columns (vocabulary_id, domain_id, concept_class_id, ...)
+            are dictionary encoded.  A list of column names selects the columns explicitly, False disables
+            dictionary encoding.
+
+        Notes
+        -----
+        The Parquet schema follows the column types of the statement, columns without a known type are
+        inferred from the first batch.  Only one row group is held in memory at a time, so combine with
+        Connection.execute(statement, chunksize=row_group_size) to stream from a server-side cursor as well.
+        Requires pyarrow.
+
+        See also
+        --------
+        as_arrow_batches
+        """
+        pa = _import_pyarrow()
+        import pyarrow.parquet as _pq
+
+        batches = self._arrow_record_batches(row_group_size)
+        first = next(batches, None)
+        schema = self._arrow_schema()
+        if first is not None:
+            # columns without a declared type take the type of the first batch
+            schema = pa.schema([field if not pa.types.is_null(field.type) else first.schema.field(i)
+                                for i, field in enumerate(schema)])
+        if use_dictionary is True:
+            use_dictionary = [name for name in schema.names if name in _CATEGORICAL_COLUMNS]
+        elif use_dictionary:
+            use_dictionary = list(use_dictionary)
+
+        def cast_batches():
+            for batch in ([first] if first is not None else []):
+                yield batch.cast(schema)
+            for batch in batches:
+                yield batch.cast(schema)
+            self.close()
+
+        if partition_cols:
+            import pyarrow.dataset as _ds
+
+            file_options = _ds.ParquetFileFormat().make_write_options(compression=compression, use_dictionary=use_dictionary)
+            reader = pa.RecordBatchReader.from_batches(schema, cast_batches())
+            _ds.write_dataset(reader, path, format='parquet', partitioning=list(partition_cols),
+                              partitioning_flavor='hive', file_options=file_options, max_rows_per_group=row_group_size,
+                              existing_data_behavior='overwrite_or_ignore')
+            return
+        with _pq.ParquetWriter(path, schema, compression=compression, use_dictionary=use_dictionary) as writer:
+            for batch in cast_batches():
+                writer.write_batch(batch, row_group_size=row_group_size)
+
+    def _categorize(self, df, categorical):
+        # categories only ever grow, so the code of a value stays the same in every chunk of the result
+        import pandas as _pd
+
+        if not categorical:
             return df
-        first_row = df.iloc[0]
-        cols_to_convert = []
-        for col in df:
-            item = first_row[col]
-            if isinstance(item, _date) or isinstance(item, _datetime):
-                df[col] = _pd.to_datetime(df[col])
+        names = _CATEGORICAL_COLUMNS if categorical is True else frozenset(categorical)
+        all_categories = self.__categories
+        if all_categories is None:
+            all_categories = self.__categories = {}
+        for i, name in enumerate(df.columns):
+            if name not in names:
+                continue
+            values = df.iloc[:, i]
+            categories = all_categories.setdefault(i, _pd.Index([], dtype=object))
+            codes = categories.get_indexer(values)
+            new = values[(codes == -1) & values.notna()].unique()
+            if len(new):
+                categories = all_categories[i] = categories.append(_pd.Index(new, dtype=object))
+                codes = categories.get_indexer(values)
+            df.isetitem(i, _pd.Categorical.from_codes(codes, categories=categories))
         return df
 
-    def as_pandas(self):
+    def as_pandas(self, categorical=False):
         """
         Return all rows from a `results` object as a pandas DataFrame
 
+        Parameters
+        ----------
+        categorical : bool or list of str, default False
+            If True, low-cardinality OMOP columns such as vocabulary_id, concept_class_id, domain_id,
+            standard_concept and relationship_id are returned as pandas Categoricals, which often needs a
+            fraction of the memory of object columns.  A list of column names selects the columns explicitly.
+
         Returns
         -------
         results : Pandas.DataFrame
 
+        Notes
+        -----
+        Column dtypes follow the column types of the statement: dates and datetimes become datetime64[ns],
+        integers the nullable Int64, numerics float64 and booleans the nullable boolean dtype.
+        Columns without a known type (e.g. raw SQL strings) are inferred from their values.
+        Drivers that export Arrow (e.g. DuckDB) are converted with the same dtypes.
+
+        Integer columns used to be int64, or float64 if they held NULLs, and boolean columns bool or object.
+        Use e.g. ``df.astype({'column': 'float64'})`` for the previous float dtype, or
+        ``results.as_arrow().to_pandas()`` for pyarrow's default conversion.
+
         See also
         --------
         as_pandas_chunks
         """
-        columns = self.keys()
-        rows = self.fetchall()
-        df = _pd.DataFrame(data=rows, columns=columns)
-        df = self._convert_dates(df)
-        return df
+        if self._native_arrow_cursor() is not None and _find_spec('pyarrow'):
+            # no Python row objects are created when the driver exports Arrow itself
+            return self._categorize(_arrow_to_pandas(self.as_arrow()), categorical)
+        return self._categorize(self._frame_from_columns(self._fetch_column_arrays()), categorical)
 
-    def as_pandas_chunks(self, chunksize):
+    def as_pandas_chunks(self, chunksize=None, categorical=False):
         """
         Yields a pandas DataFrame with n_rows = chunksize
 
         Parameters
         ----------
-        chunksize : int
-            number of rows to return in each chunk
+        chunksize : int, optional
+            number of rows to return in each chunk.  Defaults to the chunksize passed to Connection.execute.
+        categorical : bool or list of str, default False
+            Return low-cardinality columns as pandas Categoricals, see `as_pandas`.
+
+        Notes
+        -----
+        The dtypes are determined once per result so every chunk has the same dtypes, see `as_pandas`.
+        Categories are shared across chunks: a value keeps the same code in every chunk and later chunks
+        only append newly seen values to the categories.  Use pandas.api.types.union_categoricals to combine chunks.
+
+        Most drivers buffer the complete result client side unless the statement was executed with
+        Connection.execute(statement, chunksize=...), which streams the rows from a server-side cursor.
 
         See also
         --------
         as_pandas
         """
-        columns = self.keys()
+        return self._pandas_chunks(self._chunksize(chunksize), categorical)
+
+    def _pandas_chunks(self, chunksize, categorical):
+        if self._native_arrow_cursor() is not None and _find_spec('pyarrow'):
+            for batch in self.as_arrow_batches(chunksize):
+                yield self._categorize(_arrow_to_pandas(batch), categorical)
+            return
+        n_columns = len(self.keys())
         for rows in self.partitions(chunksize):
-            df = _pd.DataFrame(data=rows, columns=columns)
-            df = self._convert_dates(df)
-            yield df
+            yield self._categorize(self._frame_from_columns(_column_arrays(rows, n_columns)), categorical)
 
@@ -0,0 +1,298 @@
+"""
+Index-backed keyword search on concept names and synonyms.
+
+The keyword queries (e.g. condition_concepts_for_keyword) match concepts whose name contains a keyword,
+which is a full scan of the concept and concept_synonym tables unless the database has a suitable index.
+`create_search_indexes` builds those indexes and `keyword_criterion` uses them when they are present:
+
+- SQLite: FTS5 tables with the trigram tokenizer (``concept_fts``, ``concept_synonym_fts``).
+  These are copies of the names and have to be rebuilt after loading a new vocabulary release.
+- PostgreSQL: GIN ``pg_trgm`` indexes on ``lower(concept_name)``, which the planner uses for the
+  existing ``ILIKE`` predicate directly.
+
+Other dialects, and databases without the indexes, keep the ``lower(column) ILIKE '%keyword%'`` predicate.
+
+The indexes found in the database are remembered per Inspector.  Indexes created or dropped by other connections
+or processes are picked up by Inspector.refresh.
+"""
+import weakref as _weakref
+
+from sqlalchemy import select as _select, table as _table, column as _column, func as _func, text as _text, \
+    bindparam as _bindparam
+
+# searchable text column -> table holding it
+SEARCH_COLUMNS = {'concept_name': 'concept', 'concept_synonym_name': 'concept_synonym'}
+# the backend of each Inspector, which remembers the indexes found in the database
+_BACKENDS = _weakref.WeakKeyDictionary()
+
+
+class SearchBackend():
+    """
+    Keyword search using ``lower(column) ILIKE '%keyword%'``, the fallback for all dialects.
+
+    Parameters
+    ----------
+    inspector : inspectomop.inspector.Inspector
+    """
+    name = 'like'
+
+    def __init__(self, inspector):
+        # weak, the backend is kept in _BACKENDS keyed by the inspector and must not keep it alive
+        self.__inspector = _weakref.ref(inspector)
+
+    @property
+    def _inspector(self):
+        return self.__inspector()
+
+    def _schema(self, table_name):
+        return self._inspector.tables[table_name].__table__.schema
+
+    def criterion(self, keyword, text_column, concept_id_column):
+        """
+        Returns a criterion that is true for rows whose `text_column` contains `keyword`, ignoring case.
+
+        Parameters
+        ----------
+        keyword : str
+        text_column : sqlalchemy.sql.expression.ColumnElement
+            a concept_name or concept_synonym_name column
+        concept_id_column : sqlalchemy.sql.expression.ColumnElement
+            the concept_id column of the same row, used by backends that look keywords up in a separate index
+
+        Returns
+        -------
+        criterion : sqlalchemy.sql.expression.ColumnElement
+        """
+        return _func.lower(text_column).ilike(_bindparam('keyword_pattern', keyword_params(keyword)['keyword_pattern']))
+
+    def variant(self, keyword):
+        """
+        Returns a hashable value that is equal for keywords that produce the same criterion structure.
+        """
+        return None
+
+    def create_indexes(self, connection, schemas, rebuild=False):
+        """
+        Creates the search indexes for the tables in `schemas` (table name -> schema) and returns the index names.
+        """
+        return []
+
+    def refresh(self):
+        """
+        Looks up the search indexes in the database again, e.g. after they were created or dropped elsewhere.
+
+        Returns
+        -------
+        changed : bool
+            True if the indexes used by `criterion` changed
+        """
+        return False
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """
+    Keyword search using SQLite FTS5 tables with the trigram tokenizer (SQLite 3.34 or later).
+
+    The trigram tokenizer matches any substring of at least 3 characters, ignoring case.  Shorter keywords and
+    keywords containing LIKE wildcards fall back to the ILIKE predicate.
+    """
+    name = 'sqlite-fts5'
+
+    def __init__(self, inspector):
+        super().__init__(inspector)
+        self.__indexed = None
+
+    def _indexed(self):
+        if self.__indexed is None:
+            self.__indexed = set()
+            # tables are reflected before connecting, reflection shares the connection of single connection pools
+            schemas = {table_name: self._schema(table_name) for table_name in SEARCH_COLUMNS.values()
+                       if table_name in self._inspector.tables}
+            with self._inspector.connect() as connection:
+                for table_name, schema in schemas.items():
+                    master = '"{}".sqlite_master'.format(schema) if schema else 'sqlite_master'
+                    statement = _text("SELECT 1 FROM {} WHERE name = :name".format(master))
+                    if connection.execute(statement, {'name': table_name + '_fts'}).first() is not None:
+                        self.__indexed.add(table_name)
+        return self.__indexed
+
+    def variant(self, keyword):
+        if len(keyword) < 3 or '%' in keyword or '_' in keyword:
+            return frozenset()
+        return frozenset(self._indexed())
+
+    def refresh(self):
+        indexed, self.__indexed = self.__indexed, None
+        return indexed is not None and self._indexed() != indexed
+
+    def criterion(self, keyword, text_column, concept_id_column):
+        table_name = SEARCH_COLUMNS.get(text_column.name)
+        if table_name not in self.variant(keyword):
+            return super().criterion(keyword, text_column, concept_id_column)
+        fts = _table(table_name + '_fts', _column('concept_id'), _column(text_column.name),
+                     schema=self._schema(table_name))
+        phrase = _bindparam('keyword_phrase', keyword_params(keyword)['keyword_phrase'])
+        return concept_id_column.in_(_select(fts.c.concept_id).where(fts.c[text_column.name].op('MATCH')(phrase)))
+
+    def create_indexes(self, connection, schemas, rebuild=False):
+        created = []
+        for table_name, schema in schemas.items():
+            text_column = [name for name, table in SEARCH_COLUMNS.items() if table == table_name][0]
+            prefix = '"{}".'.format(schema) if schema else ''
+            index = '{}"{}_fts"'.format(prefix, table_name)
+            exists = connection.exec_driver_sql("SELECT 1 FROM {}sqlite_master WHERE name = ?".format(prefix),
+                                                (table_name + '_fts',)).first() is not None
+            if exists and not rebuild:
+                continue
+            connection.exec_driver_sql('DROP TABLE IF EXISTS {}'.format(index))
+            connection.exec_driver_sql("CREATE VIRTUAL TABLE {} USING fts5({}, concept_id UNINDEXED, "
+                                       "tokenize='trigram')".format(index, text_column))
+            connection.exec_driver_sql('INSERT INTO {0} ({1}, concept_id) SELECT {1}, concept_id FROM {2}"{3}" '
+                                       'WHERE {1} IS NOT NULL'.format(index, text_column, prefix, table_name))
+            created.append(table_name + '_fts')
+        self.__indexed = None
+        return created
+
+
+class PostgresTrigramBackend(SearchBackend):
+    """
+    Keyword search using ``pg_trgm`` GIN indexes on ``lower(concept_name)`` and ``lower(concept_synonym_name)``.
+
+    PostgreSQL uses these indexes for the ILIKE predicate itself, so the criterion is unchanged.
+    """
+    name = 'postgresql-trigram'
+
+    def create_indexes(self, connection, schemas, rebuild=False):
+        created = []
+        connection.exec_driver_sql('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table_name, schema in schemas.items():
+            text_column = [name for name, table in SEARCH_COLUMNS.items() if table == table_name][0]
+            prefix = '"{}".'.format(schema) if schema else ''
+            index = '{}_{}_trgm'.format(table_name, text_column)
+            if rebuild:
+                connection.exec_driver_sql('DROP INDEX IF EXISTS {}"{}"'.format(prefix, index))
+            connection.exec_driver_sql('CREATE INDEX IF NOT EXISTS "{}" ON {}"{}" USING gin (lower({}) gin_trgm_ops)'
+                                       .format(index, prefix, table_name, text_column))
+            created.append(index)
+        return created
+
+
+_DIALECT_BACKENDS = {'sqlite': SQLiteFTS5Backend, 'postgresql': PostgresTrigramBackend}
+
+
+def search_backend(inspector):
+    """
+    Returns the SearchBackend used for keyword queries on `inspector`.
+
+    Parameters
+    ----------
+    inspector : inspectomop.inspector.Inspector
+
+    Returns
+    -------
+    backend : SearchBackend
+    """
+    backend = _BACKENDS.get(inspector)
+    if backend is None:
+        backend = _DIALECT_BACKENDS.get(inspector.engine.dialect.name, SearchBackend)(inspector)
+        _BACKENDS[inspector] = backend
+    return backend
+
+
+def _refresh_search_backend(inspector):
+    # called by Inspector.refresh, backends are only refreshed once they are in use
+    backend = _BACKENDS.get(inspector)
+    return backend is not None and backend.refresh()
+
+
+def keyword_criterion(keyword, text_column, concept_id_column, inspector):
+    """
+    Returns a criterion matching rows whose `text_column` contains `keyword`, ignoring case.
+
+    Uses the search indexes created by `create_search_indexes` when they exist and
+    ``lower(text_column) ILIKE '%keyword%'`` otherwise.
+
+    Parameters
+    ----------
+    keyword : str
+    text_column : sqlalchemy.sql.expression.ColumnElement
+        a concept_name or concept_synonym_name column, possibly of an alias or subquery
+    concept_id_column : sqlalchemy.sql.expression.ColumnElement
+        the concept_id column of the same row
+    inspector : inspectomop.inspector.Inspector
+
+    Returns
+    -------
+    criterion : sqlalchemy.sql.expression.ColumnElement
+
+    Notes
+    -----
+    An index on concept_synonym matches by concept, i.e. the criterion is true for every synonym row of a concept
+    that has a matching synonym.
+
+    The keyword is bound to the parameters 'keyword_pattern' and 'keyword_phrase', see `keyword_params`.
+    """
+    return search_backend(inspector).criterion(keyword, text_column, concept_id_column)
+
+
+def keyword_variant(keyword, inspector):
+    """
+    Returns a hashable value that is equal for all keywords whose `keyword_criterion` has the same structure.
+
+    Used as the `variant` of inspectomop.cache.cached_statement for keyword queries.
+    """
+    return search_backend(inspector).variant(keyword)
+
+
+def keyword_params(keyword):
+    """
+    Returns the bind parameter values of `keyword_criterion` for `keyword`.
+
+    Used as the `params` of inspectomop.cache.cached_statement for keyword queries.
+    """
+    return {'keyword_pattern': '%{}%'.format(keyword.lower()), 'keyword_phrase': '"{}"'.format(keyword.replace('"', '""'))}
+
+
+def create_search_indexes(inspector, tables=None, rebuild=False):
+    """
+    Creates the indexes used for keyword search on concept names and synonyms.
+
+    Parameters
+    ----------
+    inspector : inspectomop.inspector.Inspector
+    tables : list of str, optional
+        tables to index, by default ['concept', 'concept_synonym']
+    rebuild : bool, default False
+        If True, existing indexes are dropped and built again, e.g. after loading a new vocabulary release.
+
+    Returns
+    -------
+    indexes : list of str
+        names of the indexes that were created.  Empty for dialects without a supported index type.
+
+    Raises
+    ------
+    ValueError
+        If a table is not searchable.
+
+    Notes
+    -----
+    SQLite builds FTS5 trigram tables holding a copy of the names (roughly 3x the size of the names).
+    PostgreSQL creates the pg_trgm extension if needed, which requires the corresponding privileges.
+    The database must be writable, e.g. not opened with profile='sqlite-analytics'.
+
+    Examples
+    --------
+    >>> from inspectomop.search import create_search_indexes
+    >>> create_search_indexes(inspector)
+    ['concept_fts', 'concept_synonym_fts']
+    """
+    table_names = list(tables) if tables is not None else list(SEARCH_COLUMNS.values())
+    unknown = [table_name for table_name in table_names if table_name not in SEARCH_COLUMNS.values()]
+    if unknown:
+        raise ValueError('Tables {} are not searchable, use any of {}'.format(unknown, list(SEARCH_COLUMNS.values())))
+    backend = search_backend(inspector)
+    # tables are reflected before the transaction starts, reflection shares the connection of single connection pools
+    schemas = {table_name: inspector.tables[table_name].__table__.schema for table_name in table_names}
+    with inspector.engine.begin() as connection:
+        return backend.create_indexes(connection, schemas, rebuild=rebuild)
@@ -0,0 +1,43 @@
+import csv
+import io
+
+import pytest
+from sqlalchemy import text
+from inspectomop.inspector import Inspector
+from inspectomop.queries.general import concepts_for_concept_ids
+from inspectomop.test import test_connection_url as connection_url
+
+@pytest.fixture(scope="module")
+
+def inspector():
+    return Inspector(connection_url())
+
+
+def test_export_csv(inspector, tmp_path):
+    statement = concepts_for_concept_ids([2, 3, 4], inspector, return_columns=['concept_id', 'concept_name'])
+    with inspector.connect() as connection:
+        expected = [[str(value) for value in row] for row in connection.execute(statement).fetchall()]
+        connection.export(statement, str(tmp_path / 'concepts.csv'), chunksize=2)
+        sink = io.StringIO()
+        connection.export(statement, sink, header=False)
+        with pytest.raises(ValueError):
+            connection.export(statement, sink, format='binary')
+    with open(str(tmp_path / 'concepts.csv'), newline='') as fh:
+        rows = list(csv.reader(fh))
+    assert rows == [['concept_id', 'concept_name']] + expected
+    assert list(csv.reader(io.StringIO(sink.getvalue()))) == expected
+
+def test_export_duckdb(tmp_path):
+    pytest.importorskip('duckdb_engine')
+    inspector = Inspector('duckdb:///:memory:')
+    with inspector.connect() as connection:
+        connection.execute(text("CREATE TABLE numbers AS SELECT range AS n, 'value ' || range AS label FROM range(5)"))
+        statement = text('SELECT n, label FROM numbers WHERE n < :limit ORDER BY n').bindparams(limit=3)
+        # paths use DuckDB's own COPY, file-like sinks the chunked fallback
+        connection.export(statement, str(tmp_path / 'numbers.csv'))
+        sink = io.StringIO()
+        connection.export(statement, sink)
+    with open(str(tmp_path / 'numbers.csv'), newline='') as fh:
+        rows = list(csv.reader(fh))
+    assert rows == [['n', 'label'], ['0', 'value 0'], ['1', 'value 1'], ['2', 'value 2']]
+    assert list(csv.reader(io.StringIO(sink.getvalue()))) == rows
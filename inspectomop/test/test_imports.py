@@ -0,0 +1,16 @@
+import subprocess
+import sys
+
+def _modules_loaded_by(statement, module_names):
+    script = 'import sys; {}; print(",".join(name for name in {!r} if name in sys.modules))'.format(statement, module_names)
+    output = subprocess.run([sys.executable, '-c', script], check=True, capture_output=True, text=True).stdout
+    return [name for name in output.strip().split(',') if name]
+
+def test_import_does_not_load_heavy_modules():
+    heavy = ['pandas', 'numpy', 'sqlalchemy.ext.automap', 'inspectomop.queries.general', 'inspectomop.queries.payer_plan']
+    assert _modules_loaded_by('import inspectomop', heavy) == []
+
+def test_query_submodules_load_on_attribute_access():
+    loaded = _modules_loaded_by('import inspectomop; inspectomop.queries.concepts_for_concept_ids',
+        ['inspectomop.queries.general', 'pandas'])
+    assert loaded == ['inspectomop.queries.general']
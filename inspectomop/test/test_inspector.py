@@ -1,29 +1,284 @@
+import os
+import shutil
+import sqlite3
+
 import pytest
+from sqlalchemy import MetaData, create_engine, select
+from sqlalchemy.pool import StaticPool
 from inspectomop.inspector import Inspector
+from inspectomop.test import test_connection_url as connection_url
 
 @pytest.fixture(scope="module")
 
 def inspector():
-    connection_url = 'sqlite:///test/test_omop.sqlite3'
-    return Inspector(connection_url)
+    return Inspector(connection_url())
 
 
-def test_attach_sqlite_db():
-    """TODO"""
-def test_clinical_data_tables():
-   """TODO"""
-def test_derived_element_tables():
-    """TODO"""
-def test_health_economic_data_tables():
-    """TODO"""
-def test_health_system_data_tables():
-    """TODO"""
-def test_metadata_tables():
-    """TODO"""
-def test_vocabulary_tables():
-    """TODO"""
+def test_attach_sqlite_db(tmp_path, monkeypatch):
+    db_file = str(tmp_path / 'vocab.sqlite3')
+    shutil.copy(connection_url().replace('sqlite:///', ''), db_file)
+    inspector = Inspector(connection_url())
+    engine = inspector.engine
+    person = inspector.tables['person']
+
+    reflected = []
+    reflect = MetaData.reflect
+    def recording_reflect(self, *args, **kwargs):
+        reflected.append(self.schema)
+        return reflect(self, *args, **kwargs)
+    monkeypatch.setattr(MetaData, 'reflect', recording_reflect)
+
+    inspector.attach_sqlite_db(db_file, 'vocab')
+    # the engine and its pool are kept, only the attached schema is reflected
+    assert inspector.engine is engine
+    assert isinstance(engine.pool, StaticPool)
+    assert inspector.tables['person'] is person
+    assert inspector.tables['vocab.person'].__table__.schema == 'vocab'
+    assert set(reflected) == {'vocab'}
+
+def test_attach_sqlite_db_pooled_connections(tmp_path):
+    from sqlalchemy.pool import QueuePool
+    db_file = str(tmp_path / 'vocab.sqlite3')
+    shutil.copy(connection_url().replace('sqlite:///', ''), db_file)
+    inspector = Inspector(connection_url(), engine_options={'poolclass': QueuePool})
+    with inspector.engine.connect() as first:
+        inspector.attach_sqlite_db(db_file, 'vocab')
+        with inspector.engine.connect() as second:
+            count = second.exec_driver_sql('SELECT COUNT(*) FROM vocab.person').scalar()
+    with inspector.engine.connect() as first_again:
+        assert first_again.exec_driver_sql('SELECT COUNT(*) FROM vocab.person').scalar() == count
+def test_clinical_data_tables(inspector):
+    assert 'person' in inspector.clinical_tables
+    assert 'concept' not in inspector.clinical_tables
+def test_derived_element_tables(inspector):
+    assert set(inspector.derived_elements_tables) == {'cohort', 'cohort_attribute', 'condition_era', 'dose_era', 'drug_era'}
+def test_health_economic_data_tables(inspector):
+    assert set(inspector.health_economics_tables) == {'cost', 'payer_plan_period'}
+def test_health_system_data_tables(inspector):
+    assert set(inspector.health_system_tables) == {'care_site', 'location', 'provider'}
+def test_metadata_tables(inspector):
+    assert set(inspector.metadata_tables) == {'cdm_source'}
+def test_vocabulary_tables(inspector):
+    assert inspector.vocabularies_tables['concept'] is inspector.tables['concept']
+    # the category index is built once and reused
+    assert inspector.vocabularies_tables is inspector.vocabularies_tables
+    with pytest.raises(KeyError):
+        inspector.vocabularies_tables['person']
 def test_table_info():
     """TODO"""
 def test_connect():
     """TODO"""
 
+def test_reflection_cache(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / 'reflection_cache')
+    first = Inspector(connection_url(), cache_dir=cache_dir)
+    table_names = set(first.tables.keys())
+    first.tables.values()
+    assert any(file_name.endswith('.pickle') for file_name in os.listdir(cache_dir))
+
+    def fail_reflect(*args, **kwargs):
+        raise AssertionError('tables should have been loaded from the reflection cache')
+    monkeypatch.setattr(MetaData, 'reflect', fail_reflect)
+    second = Inspector(connection_url(), cache_dir=cache_dir)
+    assert set(second.tables.keys()) == table_names
+    assert second.tables['concept'].__table__.name == 'concept'
+
+def test_reflection_cache_invalidated_by_schema_change(tmp_path):
+    db_file = str(tmp_path / 'omop.sqlite3')
+    shutil.copy(connection_url().replace('sqlite:///', ''), db_file)
+    cache_dir = str(tmp_path / 'reflection_cache')
+    assert 'metadata' not in Inspector('sqlite:///' + db_file, cache_dir=cache_dir).tables
+    with sqlite3.connect(db_file) as connection:
+        connection.execute('CREATE TABLE metadata (metadata_id INTEGER PRIMARY KEY, name VARCHAR(250))')
+    assert 'metadata' in Inspector('sqlite:///' + db_file, cache_dir=cache_dir).tables
+
+def test_concept_cache(monkeypatch):
+    from sqlalchemy.engine import Connection
+    from inspectomop.queries.general import concepts_for_concept_ids, synonyms_for_concept_ids
+    inspector = Inspector(connection_url(), concept_cache_size=4, concept_cache_ttl=60)
+    cache = inspector.concept_cache
+    with inspector.connect() as connection:
+        expected = {row.concept_id: row for row in connection.execute(concepts_for_concept_ids([73553, 27674, 9202], inspector))}
+        synonyms = connection.execute(synonyms_for_concept_ids([73553, 27674], inspector)).fetchall()
+    executed = []
+    original_execute = Connection.execute
+    monkeypatch.setattr(Connection, 'execute', lambda self, *args, **kwargs: executed.append(args[0]) or
+                        original_execute(self, *args, **kwargs))
+
+    assert cache.concepts([73553, 27674, -1]) == [expected[73553], expected[27674]]
+    assert cache.concepts([27674, 9202, 73553, 27674]) == [expected[27674], expected[9202], expected[73553]]
+    assert len(executed) == 2 # only 9202 was fetched by the second lookup
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert sorted(cache.synonyms([73553, 27674])) == sorted(synonyms)
+    # 4 entries at most, the least recently used concepts (-1 and 27674) were evicted
+    assert cache.info() == (2, 6, 4, 4)
+    cache.concepts([9202, 27674])
+    assert cache.info()[:2] == (3, 7) and len(executed) == 4
+
+    monkeypatch.setattr('inspectomop.cache._time.monotonic', lambda: float('inf'))
+    cache.concepts([9202])
+    assert cache.misses == 8 and len(executed) == 5
+    cache.clear()
+    assert cache.info() == (0, 0, 4, 0)
+    with pytest.raises(ValueError):
+        Inspector(connection_url(), concept_cache_size=0)
+
+def test_tables_reflected_lazily(monkeypatch):
+    reflected = []
+    reflect = MetaData.reflect
+    def recording_reflect(self, *args, **kwargs):
+        reflected.extend(kwargs.get('only') or ['*'])
+        return reflect(self, *args, **kwargs)
+    monkeypatch.setattr(MetaData, 'reflect', recording_reflect)
+
+    inspector = Inspector(connection_url())
+    assert 'person' in inspector.tables
+    assert reflected == []
+    assert inspector.tables['concept'].concept_id is not None
+    assert reflected == ['concept']
+    assert len(dict(inspector.tables.items())) == len(inspector.tables)
+
+def test_static_cdm_tables(monkeypatch):
+    def fail_reflect(*args, **kwargs):
+        raise AssertionError('reflect=False should never reflect the catalog')
+    monkeypatch.setattr(MetaData, 'reflect', fail_reflect)
+
+    inspector = Inspector(connection_url(), cdm_version='5.3', reflect=False)
+    assert 'attribute_definition' in inspector.tables
+    concept = inspector.tables['concept']
+    with inspector.connect() as connection:
+        row = connection.execute(select(concept.concept_name).where(concept.concept_id == 8507)).fetchone()
+    assert row.concept_name == 'MALE'
+    assert 'episode' in Inspector(connection_url(), cdm_version='5.4', reflect=False).derived_elements_tables
+    with pytest.raises(ValueError):
+        Inspector(connection_url(), reflect=False)
+
+def test_reflection_limited_to_omop_and_extra_tables(tmp_path):
+    db_file = str(tmp_path / 'omop.sqlite3')
+    shutil.copy(connection_url().replace('sqlite:///', ''), db_file)
+    with sqlite3.connect(db_file) as connection:
+        connection.execute('CREATE TABLE etl_scratch (row_id INTEGER PRIMARY KEY, payload TEXT)')
+    assert 'etl_scratch' not in Inspector('sqlite:///' + db_file).tables
+    inspector = Inspector('sqlite:///' + db_file, extra_tables=['etl_scratch'])
+    assert 'etl_scratch' in inspector.tables
+    assert inspector.tables['etl_scratch'].payload is not None
+
+def test_multiple_schemas(tmp_path):
+    db_file = str(tmp_path / 'vocab.sqlite3')
+    shutil.copy(connection_url().replace('sqlite:///', ''), db_file)
+
+    inspector = Inspector(connection_url())
+    inspector.attach_sqlite_db(db_file, 'vocab')
+    assert inspector.tables['concept'].__table__.schema == 'main'
+    assert inspector.tables['vocab.concept'].__table__.schema == 'vocab'
+    assert len(dict(inspector.tables.items())) == len(inspector.tables)
+
+    inspector = Inspector(connection_url(), schemas=['vocab', 'main'])
+    inspector.attach_sqlite_db(db_file, 'vocab')
+    assert inspector.tables['concept'].__table__.schema == 'vocab'
+    assert inspector.tables['main.concept'].__table__.schema == 'main'
+
+def test_refresh_reflects_changed_tables_only(tmp_path, monkeypatch):
+    db_file = str(tmp_path / 'omop.sqlite3')
+    shutil.copy(connection_url().replace('sqlite:///', ''), db_file)
+    inspector = Inspector('sqlite:///' + db_file, refresh_interval=0)
+    assert 'foo' not in inspector.tables['concept'].__table__.c
+    person = inspector.tables['person'].__table__
+    assert inspector.refresh() is False
+
+    with sqlite3.connect(db_file) as connection:
+        connection.execute('ALTER TABLE concept ADD COLUMN foo INTEGER')
+        connection.execute('CREATE TABLE metadata (metadata_id INTEGER PRIMARY KEY, name VARCHAR(250))')
+
+    reflected = []
+    reflect = MetaData.reflect
+    def recording_reflect(self, *args, **kwargs):
+        reflected.extend(kwargs.get('only') or ['*'])
+        return reflect(self, *args, **kwargs)
+    monkeypatch.setattr(MetaData, 'reflect', recording_reflect)
+
+    assert 'metadata' in inspector.tables
+    assert 'foo' in inspector.tables['concept'].__table__.c
+    assert reflected == ['concept']
+    assert inspector.tables['person'].__table__.c.keys() == person.c.keys()
+
+def test_refresh_without_refresh_interval(tmp_path, monkeypatch):
+    import inspectomop.inspector as inspector_module
+    db_file = str(tmp_path / 'omop.sqlite3')
+    shutil.copy(connection_url().replace('sqlite:///', ''), db_file)
+    fingerprinted = []
+    table_fingerprints = inspector_module.table_fingerprints
+    def recording_table_fingerprints(engine, schema=None, table_names=None):
+        fingerprinted.append(table_names)
+        return table_fingerprints(engine, schema, table_names)
+    monkeypatch.setattr(inspector_module, 'table_fingerprints', recording_table_fingerprints)
+    monkeypatch.setattr(inspector_module, 'schema_fingerprint', None) # must not be called
+
+    inspector = Inspector('sqlite:///' + db_file)
+    concept = inspector.tables['concept'].__table__
+    # only the reflected tables are fingerprinted, not the whole schema
+    reflected = set(table.name for table in concept.metadata.tables.values())
+    assert fingerprinted and all(names is not None and set(names) <= reflected for names in fingerprinted)
+    assert inspector.refresh() is False
+    with sqlite3.connect(db_file) as connection:
+        connection.execute('ALTER TABLE concept ADD COLUMN foo INTEGER')
+    assert inspector.refresh() is True
+    assert 'foo' in inspector.tables['concept'].__table__.c
+    assert inspector.refresh() is False
+
+def test_concurrent_refresh(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    db_file = str(tmp_path / 'omop.sqlite3')
+    shutil.copy(connection_url().replace('sqlite:///', ''), db_file)
+    # a pool rather than the default single shared connection so threads can read the schema concurrently
+    inspector = Inspector('sqlite:///' + db_file, engine_options={'poolclass': None})
+    inspector.tables['concept']
+    with sqlite3.connect(db_file) as connection:
+        connection.execute('ALTER TABLE concept ADD COLUMN foo INTEGER')
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        refreshed = list(executor.map(lambda _: inspector.refresh(), range(8)))
+    assert refreshed.count(True) == 1
+    assert 'foo' in inspector.tables['concept'].__table__.c
+
+def test_engine_options():
+    inspector = Inspector(connection_url(), engine_options={'pool_pre_ping': True, 'query_cache_size': 10,
+        'execution_options': {'stream_results': True}})
+    assert isinstance(inspector.engine.pool, StaticPool)
+    assert inspector.engine.pool._pre_ping
+    assert inspector.engine.get_execution_options()['stream_results']
+    with inspector.connect() as connection:
+        assert connection.execute(select(inspector.tables['person'].person_id)).fetchone() is not None
+
+def test_prebuilt_engine():
+    engine = create_engine(connection_url(), poolclass=StaticPool)
+    inspector = Inspector(engine=engine)
+    assert inspector.engine is engine
+    assert inspector.connection_url == connection_url()
+    assert 'person' in inspector.tables
+    with pytest.raises(ValueError):
+        Inspector(connection_url(), engine=engine)
+
+def test_sqlite_analytics_profile(tmp_path):
+    from sqlalchemy.exc import OperationalError
+    inspector = Inspector(connection_url(), profile='sqlite-analytics')
+    assert inspector.engine.url.query['immutable'] == '1'
+    with inspector.engine.connect() as connection:
+        assert connection.exec_driver_sql('PRAGMA mmap_size').scalar() > 0
+        assert connection.exec_driver_sql('PRAGMA query_only').scalar() == 1
+        with pytest.raises(OperationalError):
+            connection.exec_driver_sql('DELETE FROM person')
+    assert 'person' in inspector.tables
+
+    # databases in WAL mode are opened read-only but not immutable so the write-ahead log is still read
+    db_file = str(tmp_path / 'wal.sqlite3')
+    shutil.copy(connection_url().replace('sqlite:///', ''), db_file)
+    with sqlite3.connect(db_file) as connection:
+        connection.execute('PRAGMA journal_mode=WAL')
+    inspector = Inspector('sqlite:///' + db_file, profile='sqlite-analytics')
+    assert inspector.engine.url.query['mode'] == 'ro'
+    assert 'immutable' not in inspector.engine.url.query
+
+    with pytest.raises(ValueError):
+        Inspector(connection_url(), profile='unknown')
+    with pytest.raises(ValueError):
+        Inspector('postgresql://user@host/omop', profile='sqlite-analytics')
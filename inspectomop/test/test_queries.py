@@ -0,0 +1,195 @@
+import shutil
+
+import pytest
+from inspectomop.inspector import Inspector
+from inspectomop.queries import condition, general, observation, procedure
+from inspectomop.search import create_search_indexes, search_backend
+from inspectomop.test import test_connection_url as connection_url
+
+@pytest.fixture(scope="module")
+
+def inspector():
+    return Inspector(connection_url())
+
+
+HIERARCHY_QUERIES = [
+    (general.ancestors_for_concept_id, general.ancestors_for_concept_ids),
+    (general.descendants_for_concept_id, general.descendants_for_concept_ids),
+    (general.parents_for_concept_id, general.parents_for_concept_ids),
+    (general.children_for_concept_id, general.children_for_concept_ids),
+    (general.siblings_for_concept_id, general.siblings_for_concept_ids),
+]
+
+@pytest.mark.parametrize('in_list_max, values_max', [(1000, 10000), (1, 10000), (1, 2)])
+@pytest.mark.parametrize('single_query, batched_query', HIERARCHY_QUERIES)
+def test_batched_hierarchy_queries(inspector, monkeypatch, single_query, batched_query, in_list_max, values_max):
+    # the thresholds are lowered to exercise the inline and chunked IN list strategies
+    monkeypatch.setattr(general, '_IN_LIST_MAX', in_list_max)
+    monkeypatch.setattr(general, '_VALUES_MAX', values_max)
+    concept_ids = [73553, 27674, 9202, 4342637, 73840, 73553]
+    with inspector.connect() as connection:
+        expected = set()
+        for concept_id in set(concept_ids):
+            expected.update((concept_id,) + tuple(row) for row in connection.execute(single_query(concept_id, inspector)))
+        statement = batched_query(concept_ids, inspector)
+        rows = connection.execute(statement).fetchall()
+    assert list(statement.selected_columns.keys())[0] == 'concept_id'
+    assert expected and set(tuple(row) for row in rows) == expected
+
+def test_batched_query_long_list_writes_nothing(inspector):
+    concept_ids = list(range(1, 20002)) + [73840]
+    with inspector.connect() as connection:
+        expected = connection.execute(general.parents_for_concept_ids([73840], inspector)).fetchall()
+        rows = connection.execute(general.parents_for_concept_ids(concept_ids, inspector)).fetchall()
+        temp_tables = connection.exec_driver_sql('SELECT name FROM sqlite_temp_master').fetchall()
+    assert expected and set(rows) >= set(expected)
+    assert temp_tables == []
+
+def test_batched_query_values_strategy(monkeypatch):
+    pytest.importorskip('duckdb_engine')
+    monkeypatch.setattr(general, '_IN_LIST_MAX', 1)
+    monkeypatch.setattr(general, '_VALUES_MAX', 2)
+    inspector = Inspector('duckdb:///:memory:', cdm_version='5.4', reflect=False)
+    with inspector.connect() as connection:
+        connection.exec_driver_sql("CREATE TABLE vocabulary AS SELECT 'V' AS vocabulary_id, 'Vocab' AS vocabulary_name")
+        connection.exec_driver_sql("CREATE TABLE concept AS SELECT range AS concept_id, range::VARCHAR AS concept_name, "
+                                   "range::VARCHAR AS concept_code, 'C' AS concept_class_id, 'V' AS vocabulary_id FROM range(1, 7)")
+        connection.exec_driver_sql("CREATE TABLE concept_ancestor AS SELECT * FROM (VALUES (1, 4, 1), (2, 5, 1), (3, 6, 1)) "
+                                   "AS t(ancestor_concept_id, descendant_concept_id, min_levels_of_separation)")
+        statement = general.children_for_concept_ids([1, 2, 3], inspector, return_columns=['child_concept_id'])
+        assert 'VALUES' in str(statement.compile(dialect=inspector.engine.dialect))
+        rows = connection.execute(statement).fetchall()
+    assert sorted(tuple(row) for row in rows) == [(1, 4), (2, 5), (3, 6)]
+
+@pytest.mark.parametrize('dialect_name, uses_values', [('mysql', False), ('oracle', False), ('postgresql', True),
+                                                      ('mssql', True)])
+def test_batched_query_values_only_where_supported(monkeypatch, dialect_name, uses_values):
+    import importlib
+    from types import SimpleNamespace
+    from sqlalchemy import column
+    monkeypatch.setattr(general, '_IN_LIST_MAX', 2)
+    monkeypatch.setattr(general, '_VALUES_MAX', 3)
+    dialect = importlib.import_module('sqlalchemy.dialects.' + dialect_name).dialect()
+    # only the dialect name of the inspector is used, no driver is needed to compile
+    inspector = SimpleNamespace(engine=SimpleNamespace(dialect=dialect))
+    criterion = general._concept_ids_criterion(column('concept_id'), range(1, 8), inspector)
+    sql = str(criterion.compile(dialect=dialect, compile_kwargs={'render_postcompile': True}))
+    assert ('VALUES' in sql) == uses_values
+    assert all(str(concept_id) in sql for concept_id in range(1, 8))
+
+KEYWORD_QUERIES = [condition.condition_concepts_for_keyword, condition.pathogen_concept_for_keyword,
+    condition.disease_causing_agents_for_keyword, condition.anatomical_site_by_keyword,
+    observation.observation_concepts_for_keyword, procedure.procedure_concepts_for_keyword]
+
+def test_keyword_queries_use_search_indexes(inspector, tmp_path):
+    db_file = str(tmp_path / 'omop.sqlite3')
+    shutil.copy(connection_url().replace('sqlite:///', ''), db_file)
+    indexed = Inspector('sqlite:///' + db_file)
+    assert create_search_indexes(indexed) == ['concept_fts', 'concept_synonym_fts']
+    assert create_search_indexes(indexed) == []
+    assert search_backend(indexed).name == 'sqlite-fts5'
+    with pytest.raises(ValueError):
+        create_search_indexes(indexed, tables=['person'])
+
+    keywords = ['Pain', 'arthritis', 'ab', 'o"b', 'MILLI', 'heart', 'ectomy', '%ia', 'zzzz']
+    matches = {}
+    with inspector.connect() as connection, indexed.connect() as indexed_connection:
+        for query in KEYWORD_QUERIES:
+            for keyword in keywords:
+                statement = query(keyword, indexed)
+                assert ('MATCH' in str(statement)) == (len(keyword) >= 3 and '%' not in keyword)
+                expected = set(connection.execute(query(keyword, inspector)).fetchall())
+                assert set(indexed_connection.execute(statement).fetchall()) == expected
+                matches[query.__name__] = matches.get(query.__name__, 0) + len(expected)
+    assert matches['condition_concepts_for_keyword'] and matches['observation_concepts_for_keyword'] and \
+        matches['procedure_concepts_for_keyword']
+
+def test_search_indexes_created_elsewhere_picked_up_by_refresh(tmp_path):
+    import sqlite3
+    db_file = str(tmp_path / 'omop.sqlite3')
+    shutil.copy(connection_url().replace('sqlite:///', ''), db_file)
+    inspector = Inspector('sqlite:///' + db_file)
+    assert 'MATCH' not in str(condition.condition_concepts_for_keyword('pain', inspector))
+    create_search_indexes(Inspector('sqlite:///' + db_file))
+    inspector.refresh()
+    statement = condition.condition_concepts_for_keyword('pain', inspector)
+    assert 'MATCH' in str(statement)
+    with inspector.connect() as connection:
+        assert connection.execute(statement).fetchall()
+    with sqlite3.connect(db_file) as connection:
+        connection.execute('DROP TABLE concept_fts')
+        connection.execute('DROP TABLE concept_synonym_fts')
+    inspector.refresh()
+    assert 'MATCH' not in str(condition.condition_concepts_for_keyword('pain', inspector))
+
+def test_keyword_queries_do_not_keep_inspector_alive():
+    import gc
+    import weakref
+    inspector = Inspector(connection_url())
+    condition.condition_concepts_for_keyword('pain', inspector)
+    assert search_backend(inspector)._inspector is inspector
+    reference = weakref.ref(inspector)
+    del inspector
+    gc.collect()
+    assert reference() is None
+
+from inspectomop.queries import drug, person
+
+REUSED_QUERIES = [
+    (general.related_concepts_for_concept_id, 73553, 27674),
+    (general.ancestors_for_concept_id, 73840, 4342637),
+    (general.children_for_concept_id, 4342637, 73553),
+    (general.siblings_for_concept_id, 73840, 27674),
+    (condition.source_codes_for_concept_ids, [73553], [27674, 73840]),
+    (condition.anatomical_site_by_keyword, 'joint', 'knee'),
+    (drug.ingredients_for_drug_concept_ids, [700325], [700493, 704944]),
+    (procedure.procedure_concepts_for_keyword, 'heart', 'ectomy'),
+    (person.patient_counts_by_year_of_birth, None, [1, 2, 3]),
+]
+
+@pytest.mark.parametrize('query, first, second', REUSED_QUERIES)
+def test_statements_reused(query, first, second):
+    inspector = Inspector(connection_url())
+    if query.__module__.endswith('person'):
+        build = lambda value, **kwargs: query(inspector, value, **kwargs)
+        fresh = lambda value: query.__wrapped__(inspector, value)
+    else:
+        build = lambda value, **kwargs: query(value, inspector, **kwargs)
+        fresh = lambda value: query.__wrapped__(value, inspector)
+    with inspector.connect() as connection:
+        build(first)
+        hits = inspector.statement_cache.info().hits
+        statement = build(second)
+        # the second call must not return rows of the first
+        assert sorted(connection.execute(statement).fetchall()) == sorted(connection.execute(fresh(second)).fetchall())
+        assert sorted(connection.execute(build(first)).fetchall()) == sorted(connection.execute(fresh(first)).fetchall())
+    reused = inspector.statement_cache.info().hits - hits
+    assert reused == (1 if query.__module__.endswith('person') else 2)
+    assert list(build(second, return_columns=[statement.selected_columns.keys()[-1]]).selected_columns.keys()) == \
+        [statement.selected_columns.keys()[-1]]
+
+@pytest.mark.parametrize('query, first, second', REUSED_QUERIES[:-1] + [(person.patient_counts_by_year_of_birth, [1], [2, 3])])
+def test_reused_statements_stable(query, first, second):
+    inspector = Inspector(connection_url())
+    if query.__module__.endswith('person'):
+        build = lambda value: query(inspector, value)
+        fresh = lambda value: query.__wrapped__(inspector, value)
+    else:
+        build = lambda value: query(value, inspector)
+        fresh = lambda value: query.__wrapped__(value, inspector)
+    statements = [build(first), build(second), build(first), fresh(second)]
+    # only the bound values change between calls, so SQLAlchemy's compiled cache is hit every time
+    assert len(set(str(statement) for statement in statements)) == 1
+    assert len(set(statement._generate_cache_key().key for statement in statements[:-1])) == 1
+
+def test_statement_cache_cleared_on_refresh(tmp_path):
+    import sqlite3
+    db_file = str(tmp_path / 'omop.sqlite3')
+    shutil.copy(connection_url().replace('sqlite:///', ''), db_file)
+    inspector = Inspector('sqlite:///' + db_file)
+    general.ancestors_for_concept_id(73553, inspector)
+    assert len(inspector.statement_cache) == 1
+    with sqlite3.connect(db_file) as connection:
+        connection.execute('CREATE TABLE metadata (metadata_id INTEGER PRIMARY KEY, name VARCHAR(250))')
+    assert inspector.refresh()
+    assert len(inspector.statement_cache) == 0
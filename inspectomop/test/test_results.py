@@ -0,0 +1,228 @@
+import copy
+import sqlite3
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.engine import CursorResult, Result
+from inspectomop.inspector import Inspector
+from inspectomop.results import Results
+from inspectomop.test import test_connection_url as connection_url
+
+@pytest.fixture(scope="module")
+
+def inspector():
+    return Inspector(connection_url())
+
+
+def test_as_arrow(inspector):
+    pa = pytest.importorskip('pyarrow')
+    person = inspector.tables['person']
+    statement = select(person.person_id, person.year_of_birth, person.person_source_value).order_by(person.person_id)
+    with inspector.connect() as connection:
+        expected = connection.execute(statement).fetchall()
+        table = connection.execute(statement).as_arrow()
+        batches = list(connection.execute(statement).as_arrow_batches(3))
+        empty = connection.execute(statement.where(person.person_id < 0)).as_arrow()
+    assert isinstance(table, pa.Table)
+    assert table.column_names == ['person_id', 'year_of_birth', 'person_source_value']
+    assert [tuple(row.values()) for row in table.to_pylist()] == [tuple(row) for row in expected]
+    assert [batch.num_rows for batch in batches] == [3, 3, 3, 1]
+    assert pa.Table.from_batches(batches).equals(table)
+    assert empty.num_rows == 0 and empty.column_names == table.column_names
+
+def test_as_arrow_native_duckdb():
+    pa = pytest.importorskip('pyarrow')
+    pytest.importorskip('duckdb_engine')
+    inspector = Inspector('duckdb:///:memory:', extra_tables=['numbers'])
+    with inspector.connect() as connection:
+        connection.execute(text("CREATE TABLE numbers AS SELECT range AS n, DATE '2020-01-01' + range::INTEGER AS d, "
+                                "CASE WHEN range % 2 = 0 THEN range END AS m, range % 3 = 0 AS b, "
+                                "range::DECIMAL(10, 2) AS x FROM range(10)"))
+        results = connection.execute(text('SELECT * FROM numbers ORDER BY n'))
+        assert results._native_arrow_cursor() is not None
+        table = results.as_arrow()
+        batches = list(connection.execute(text('SELECT * FROM numbers ORDER BY n')).as_arrow_batches(4))
+        df = connection.execute(text('SELECT * FROM numbers ORDER BY n')).as_pandas()
+        chunks = list(connection.execute(text('SELECT * FROM numbers ORDER BY n')).as_pandas_chunks(4))
+        # the row based conversion used by other drivers
+        import sqlalchemy as sa
+        numbers = sa.table('numbers', sa.column('n', sa.Integer), sa.column('d', sa.Date), sa.column('m', sa.Integer),
+                           sa.column('b', sa.Boolean), sa.column('x', sa.Numeric))
+        rows = connection.execute(select(numbers).order_by(numbers.c.n))
+        expected = rows._frame_from_columns(rows._fetch_column_arrays())
+    assert table.column('n').to_pylist() == list(range(10))
+    assert max(batch.num_rows for batch in batches) <= 4 and sum(batch.num_rows for batch in batches) == 10
+    assert df['n'].tolist() == list(range(10))
+    # the native Arrow conversion uses the same dtypes as the row based one
+    assert [str(dtype) for dtype in df.dtypes] == ['Int64', 'datetime64[ns]', 'Int64', 'boolean', 'float64']
+    assert df.dtypes.tolist() == expected.dtypes.tolist()
+    assert all(chunk.dtypes.tolist() == df.dtypes.tolist() for chunk in chunks)
+    assert df['m'].isna().tolist() == [n % 2 == 1 for n in range(10)]
+
+def test_as_pandas(inspector, monkeypatch):
+    import pandas as pd
+    from sqlalchemy.engine.cursor import CursorResult
+    condition = inspector.tables['condition_occurrence']
+    person = inspector.tables['person']
+    statement = select(condition, person.person_id).join(person, person.person_id == condition.person_id)
+    with inspector.connect() as connection:
+        rows = connection.execute(statement).fetchall()
+        expected = pd.DataFrame(data=rows, columns=list(connection.execute(statement).keys()))
+        df = connection.execute(statement).as_pandas()
+        chunks = list(connection.execute(statement).as_pandas_chunks(100))
+        # drivers that know the row count up front fill preallocated columns
+        monkeypatch.setattr(CursorResult, 'rowcount', property(lambda self: len(rows)))
+        preallocated = connection.execute(statement).as_pandas()
+    assert list(df.columns) == list(expected.columns)
+    assert df.shape == expected.shape
+    assert df['condition_concept_id'].dtype == 'Int64'
+    assert str(df['condition_start_date'].dtype).startswith('datetime64')
+    assert df.iloc[:, 0].tolist() == expected.iloc[:, 0].tolist()
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), df)
+    pd.testing.assert_frame_equal(preallocated, df)
+
+def test_as_pandas_duplicate_columns(inspector):
+    with inspector.connect() as connection:
+        df = connection.execute(text('SELECT person_id, person_id FROM person')).as_pandas()
+    assert list(df.columns) == ['person_id', 'person_id']
+    assert df.shape == (10, 2)
+
+def test_as_pandas_dtypes_from_column_types(inspector):
+    from sqlalchemy import case
+    condition = inspector.tables['condition_occurrence']
+    # the first chunk has no end dates, dtypes must come from the column types rather than the first row
+    ordered = condition.condition_occurrence_id
+    end_date = case((ordered <= 100, None), else_=condition.condition_end_date).label('condition_end_date')
+    statement = select(ordered, end_date, condition.stop_reason).order_by(ordered)
+    with inspector.connect() as connection:
+        chunks = list(connection.execute(statement).as_pandas_chunks(50))
+    assert chunks[0]['condition_end_date'].isna().all()
+    for chunk in chunks:
+        assert chunk.dtypes.tolist() == chunks[0].dtypes.tolist()
+    assert chunks[0]['condition_occurrence_id'].dtype == 'Int64'
+    assert str(chunks[0]['condition_end_date'].dtype) == 'datetime64[ns]'
+    assert chunks[0]['stop_reason'].dtype == object
+
+def test_as_pandas_categorical(inspector):
+    import pandas as pd
+    concept = inspector.tables['concept']
+    statement = select(concept.concept_id, concept.vocabulary_id, concept.domain_id, concept.concept_name)\
+        .order_by(concept.concept_id)
+    with inspector.connect() as connection:
+        plain = connection.execute(statement).as_pandas()
+        df = connection.execute(statement).as_pandas(categorical=True)
+        chunks = list(connection.execute(statement).as_pandas_chunks(500, categorical=['domain_id']))
+    assert isinstance(df['vocabulary_id'].dtype, pd.CategoricalDtype)
+    assert df['concept_name'].dtype == object
+    assert df['vocabulary_id'].astype(object).tolist() == plain['vocabulary_id'].tolist()
+    assert df.memory_usage(deep=True)['vocabulary_id'] < plain.memory_usage(deep=True)['vocabulary_id'] / 5
+    # categories only grow so a value has the same code in every chunk
+    codes = {}
+    for chunk in chunks:
+        assert chunk['vocabulary_id'].dtype == object
+        categories = list(chunk['domain_id'].cat.categories)
+        for code, value in enumerate(categories):
+            assert codes.setdefault(value, code) == code
+    combined = pd.api.types.union_categoricals([chunk['domain_id'] for chunk in chunks])
+    assert list(combined.astype(object)) == plain['domain_id'].tolist()
+
+def test_as_pandas_chunks_streamed(tmp_path):
+    db_file = str(tmp_path / 'events.sqlite3')
+    with sqlite3.connect(db_file) as connection:
+        connection.execute('CREATE TABLE events (event_id INTEGER, person_id INTEGER, source_value TEXT)')
+        connection.execute("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 2500) "
+                           "INSERT INTO events SELECT i, i % 100, 'source value ' || i FROM n")
+    inspector = Inspector('sqlite:///' + db_file)
+
+    with inspector.connect() as connection:
+        results = connection.execute(text('SELECT * FROM events'), chunksize=1000)
+        # yield_per streams from a server-side cursor where the driver has one and caps sqlalchemy's row buffer
+        options = results.context.execution_options
+        assert options['yield_per'] == 1000 and options['stream_results'] is True
+        assert options['max_row_buffer'] == 1000
+        assert [len(df) for df in results.as_pandas_chunks()] == [1000, 1000, 500]
+
+        results = connection.execute(text('SELECT * FROM events'))
+        assert 'yield_per' not in results.context.execution_options
+        assert 'stream_results' not in results.context.execution_options
+        with pytest.raises(ValueError):
+            results.as_pandas_chunks()
+
+def test_to_parquet(inspector, tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.parquet as pq
+    concept = inspector.tables['concept']
+    statement = select(concept.concept_id, concept.concept_name, concept.vocabulary_id, concept.valid_start_date)\
+        .order_by(concept.concept_id)
+    with inspector.connect() as connection:
+        expected = connection.execute(statement).as_arrow()
+        connection.execute(statement).to_parquet(str(tmp_path / 'concept.parquet'), row_group_size=1000,
+                                                 compression='zstd')
+        connection.execute(statement).to_parquet(str(tmp_path / 'by_vocabulary'), partition_cols=['vocabulary_id'])
+        connection.execute(statement.where(concept.concept_id < 0)).to_parquet(str(tmp_path / 'empty.parquet'))
+
+    parquet_file = pq.ParquetFile(str(tmp_path / 'concept.parquet'))
+    assert parquet_file.metadata.num_row_groups == 3
+    assert parquet_file.schema_arrow.field('concept_id').type == pa.int64()
+    assert parquet_file.schema_arrow.field('valid_start_date').type == pa.date32()
+    column_chunks = parquet_file.metadata.row_group(0)
+    encodings = {column_chunks.column(i).path_in_schema: column_chunks.column(i).encodings for i in range(4)}
+    assert 'RLE_DICTIONARY' in encodings['vocabulary_id'] and 'RLE_DICTIONARY' not in encodings['concept_name']
+    assert column_chunks.column(0).compression == 'ZSTD'
+    assert parquet_file.read().equals(expected)
+
+    dataset = pq.read_table(str(tmp_path / 'by_vocabulary'))
+    assert dataset.num_rows == expected.num_rows
+    assert set(dataset.column('vocabulary_id').to_pylist()) == set(expected.column('vocabulary_id').to_pylist())
+    empty = pq.read_table(str(tmp_path / 'empty.parquet'))
+    assert empty.num_rows == 0 and empty.schema.equals(expected.schema)
+
+def test_results_delegates_to_cursor_result(inspector):
+    person = inspector.tables['person']
+    statement = select(person.person_id).order_by(person.person_id)
+    with inspector.connect() as connection:
+        person_ids = connection.execute(statement).scalars().all()
+        results = connection.execute(statement)
+        with pytest.raises(AttributeError):
+            results.extra_attribute = None # __slots__, no per-instance __dict__
+        # a wrapper, not a CursorResult subclass
+        assert type(results) is Results and results.__class__ is Results
+        assert not isinstance(results, CursorResult) and not isinstance(results, Result)
+        copied = copy.copy(results)
+        assert type(copied) is Results and copied.keys() == results.keys()
+        with pytest.raises(AttributeError):
+            Results.__new__(Results).rowcount # unset slots must not recurse through __getattr__
+        assert results.returns_rows and list(results.keys()) == ['person_id']
+        assert results.fetchone() == (person_ids[0],)
+        assert [row.person_id for row in results] == person_ids[1:]
+        with connection.execute(statement) as results:
+            assert results.fetchmany(2) == [(person_ids[0],), (person_ids[1],)]
+        assert connection.execute(statement.where(person.person_id == person_ids[2])).one_or_none() == (person_ids[2],)
+
+def test_as_numpy(inspector):
+    import numpy as np
+    from sqlalchemy import case
+    condition = inspector.tables['condition_occurrence']
+    visit_id = case((condition.condition_occurrence_id % 2 == 0, None), else_=condition.visit_occurrence_id)
+    statement = select(condition.person_id, condition.condition_concept_id, condition.condition_start_date,
+                       visit_id.label('visit_occurrence_id')).order_by(condition.condition_occurrence_id)
+    with inspector.connect() as connection:
+        rows = connection.execute(statement).fetchall()
+        arrays = connection.execute(statement).as_numpy()
+        structured = connection.execute(statement).as_numpy(structured=True)
+        chunks = list(connection.execute(statement).as_numpy_chunks(400))
+        with pytest.raises(ValueError):
+            connection.execute(text('SELECT person_id, person_id FROM person')).as_numpy()
+    assert arrays['person_id'].dtype == np.int64
+    assert arrays['condition_start_date'].dtype == np.dtype('datetime64[D]')
+    assert arrays['person_id'].tolist() == [row.person_id for row in rows]
+    assert arrays['condition_start_date'][0] == np.datetime64(rows[0].condition_start_date)
+    # NULL ids are masked rather than turning the column into floats
+    visit_ids = arrays['visit_occurrence_id']
+    assert isinstance(visit_ids, np.ma.MaskedArray) and visit_ids.dtype == np.int64
+    assert visit_ids.mask.tolist() == [row.visit_occurrence_id is None for row in rows]
+    assert structured.dtype.names == ('person_id', 'condition_concept_id', 'condition_start_date', 'visit_occurrence_id')
+    assert structured['condition_concept_id'].tolist() == arrays['condition_concept_id'].tolist()
+    assert structured['visit_occurrence_id'].mask.tolist() == visit_ids.mask.tolist()
+    assert [len(chunk['person_id']) for chunk in chunks] == [400, 400, len(rows) - 800]
+    assert all(chunk['condition_start_date'].dtype == np.dtype('datetime64[D]') for chunk in chunks)
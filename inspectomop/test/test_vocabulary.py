@@ -0,0 +1,68 @@
+import pytest
+from inspectomop.inspector import Inspector
+from inspectomop.queries import general
+from inspectomop.test import test_connection_url as connection_url
+from inspectomop.vocabulary import VocabularyGraph
+
+@pytest.fixture(scope="module")
+
+def inspector():
+    return Inspector(connection_url())
+
+@pytest.fixture(scope="module")
+
+def graph(inspector):
+    # concept_ancestor only, the SQL queries do not follow 'Is a' relationships
+    return VocabularyGraph(inspector, is_a_relationships=False, concept_details=True)
+
+
+CONCEPT_IDS = [73553, 27674, 9202, 4342637, 73840]
+HIERARCHY_QUERIES = [
+    ('ancestors', general.ancestors_for_concept_id),
+    ('descendants', general.descendants_for_concept_id),
+    ('parents', general.parents_for_concept_id),
+    ('children', general.children_for_concept_id),
+    ('siblings', general.siblings_for_concept_id),
+]
+
+@pytest.mark.parametrize('lookup, query', HIERARCHY_QUERIES)
+def test_graph_matches_sql(inspector, graph, lookup, query):
+    from sqlalchemy import select
+    concept = inspector.tables['concept']
+    expected = set()
+    with inspector.connect() as connection:
+        known = set(connection.execute(select(concept.concept_id).where(concept.concept_id.in_(CONCEPT_IDS))).scalars())
+        for concept_id in CONCEPT_IDS:
+            expected.update((concept_id,) + tuple(row) for row in connection.execute(query(concept_id, inspector)))
+    result = getattr(graph, lookup)(CONCEPT_IDS)
+    assert result.dtype.names[1:] == tuple(query(CONCEPT_IDS[0], inspector).selected_columns.keys())
+    # the SQL queries join to concept, so concepts missing from the concept table are dropped
+    found = set(tuple(row) for row in result.tolist() if row[2] is not None)
+    assert expected and found >= expected
+    assert all(row[0] not in known for row in found - expected)
+    single = getattr(graph, lookup)(CONCEPT_IDS[1])
+    assert single.dtype.names == result.dtype.names[1:]
+    assert single.tolist() == [row[1:] for row in result.tolist() if row[0] == CONCEPT_IDS[1]]
+
+def test_graph_lookups(inspector, graph):
+    descendants = graph.descendants(73553, return_columns=['descendant_concept_id', 'min_levels_of_separation',
+                                                           'max_levels_of_separation'])
+    assert descendants.dtype.names == ('descendant_concept_id', 'min_levels_of_separation', 'max_levels_of_separation')
+    first = descendants[0]
+    assert graph.separation(73553, int(first['descendant_concept_id'])) == \
+        (first['min_levels_of_separation'], first['max_levels_of_separation'])
+    assert graph.separation(int(first['descendant_concept_id']), 73553) is None
+    assert 73553 in graph and -1 not in graph
+    assert len(graph.ancestors(-1)) == 0 and len(graph.children([])) == 0
+    # any iterable of ids is accepted, like the batched SQL queries
+    expected = graph.descendants([73553, 27674])
+    assert (graph.descendants({73553, 27674}) == expected).all()
+    assert (graph.descendants(concept_id for concept_id in [73553, 27674]) == expected).all()
+    assert len(graph.parents(set())) == 0
+
+    ids_only = VocabularyGraph(inspector)
+    assert ids_only.children(73553).dtype.names == ('child_concept_id',)
+    with pytest.raises(ValueError):
+        ids_only.children(73553, return_columns=['child_concept_name'])
+    # 'Is a' relationships add parent/child edges to the ones in concept_ancestor
+    assert set(graph.children(73553)['child_concept_id']) <= set(ids_only.children(73553)['child_concept_id'])
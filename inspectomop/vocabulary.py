@@ -0,0 +1,348 @@
+"""
+In-memory vocabulary hierarchy.
+
+`VocabularyGraph` loads the concept hierarchy once and answers hierarchy lookups without querying the database.
+"""
+from numbers import Integral as _Integral
+
+import numpy as _np
+from sqlalchemy import select as _select, and_ as _and_
+
+# result columns of each lookup as (name, source, attribute).  source is 'concept' for the concept found,
+# 'parent' for the parent a sibling was found through and 'min'/'max' for the levels of separation.
+_DETAIL_ATTRIBUTES = ('concept_name', 'concept_code', 'concept_class_id', 'vocabulary_id', 'vocabulary_name')
+_COLUMNS = {
+    'ancestors': [('ancestor_concept_id', 'concept', 'concept_id'), ('ancestor_concept_name', 'concept', 'concept_name'),
+        ('ancestor_concept_code', 'concept', 'concept_code'), ('ancestor_concept_class_id', 'concept', 'concept_class_id'),
+        ('vocabulary_id', 'concept', 'vocabulary_id'), ('vocabulary_name', 'concept', 'vocabulary_name'),
+        ('min_levels_of_separation', 'min', None), ('max_levels_of_separation', 'max', None)],
+    'descendants': [('descendant_concept_id', 'concept', 'concept_id'), ('descendant_concept_name', 'concept', 'concept_name'),
+        ('descendant_concept_code', 'concept', 'concept_code'), ('descendant_concept_class_id', 'concept', 'concept_class_id'),
+        ('vocabulary_id', 'concept', 'vocabulary_id'), ('vocabulary_name', 'concept', 'vocabulary_name'),
+        ('min_levels_of_separation', 'min', None), ('max_levels_of_separation', 'max', None)],
+    'parents': [('parent_concept_id', 'concept', 'concept_id'), ('parent_concept_name', 'concept', 'concept_name'),
+        ('parent_concept_code', 'concept', 'concept_code'), ('parent_concept_class_id', 'concept', 'concept_class_id'),
+        ('parent_concept_vocabulary_id', 'concept', 'vocabulary_id'), ('parent_concept_vocab_name', 'concept', 'vocabulary_name')],
+    'children': [('child_concept_id', 'concept', 'concept_id'), ('child_concept_name', 'concept', 'concept_name'),
+        ('child_concept_code', 'concept', 'concept_code'), ('child_concept_class_id', 'concept', 'concept_class_id'),
+        ('child_concept_vocabulary_id', 'concept', 'vocabulary_id'), ('child_concept_vocab_name', 'concept', 'vocabulary_name')],
+    'siblings': [('sibling_concept_id', 'concept', 'concept_id'), ('sibling_concept_name', 'concept', 'concept_name'),
+        ('sibling_concept_code', 'concept', 'concept_code'), ('sibling_concept_class_id', 'concept', 'concept_class_id'),
+        ('sibling_concept_vocabulary_id', 'concept', 'vocabulary_id'), ('parent_concept_id', 'parent', 'concept_id'),
+        ('parent_concept_name', 'parent', 'concept_name')],
+}
+
+
+class _CSR():
+    """
+    Compressed sparse row adjacency: the neighbours of node i are indices[indptr[i]:indptr[i + 1]].
+    """
+    __slots__ = ('indptr', 'indices', 'data')
+
+    def __init__(self, rows, columns, n_nodes, *data):
+        order = _np.lexsort((columns, rows))
+        self.indptr = _np.zeros(n_nodes + 1, dtype=_np.int64)
+        _np.cumsum(_np.bincount(rows, minlength=n_nodes), out=self.indptr[1:])
+        self.indices = columns[order].astype(_np.int32)
+        self.data = [values[order] for values in data]
+
+    def gather(self, nodes):
+        # positions of the neighbours of every node in `nodes` and the node each position belongs to
+        starts = self.indptr[nodes]
+        counts = self.indptr[nodes + 1] - starts
+        total = int(counts.sum())
+        owners = _np.repeat(_np.arange(len(nodes)), counts)
+        positions = _np.repeat(starts - _np.cumsum(counts) + counts, counts) + _np.arange(total)
+        return positions, owners
+
+
+class VocabularyGraph():
+    """
+    An in-memory copy of the concept hierarchy for fast ancestor, descendant, parent, child and sibling lookups.
+
+    The concept_ancestor table (and optionally 'Is a' relationships from concept_relationship) is loaded once into
+    compressed sparse row adjacency arrays, after which lookups take microseconds and never touch the database.
+
+    Parameters
+    ----------
+    inspector : inspectomop.inspector.Inspector
+    is_a_relationships : bool, default True
+        If True, 'Is a' relationships from concept_relationship are added to the parent/child edges.
+        This links concepts that are missing from concept_ancestor, e.g. non-standard concepts.
+    concept_details : bool, default False
+        If True, the name, code, class and vocabulary of every concept are loaded as well so that lookups can
+        return the same columns as the SQL queries in inspectomop.queries.general.
+
+    Notes
+    -----
+    Ancestors and descendants come from concept_ancestor.  Parents and children are ancestors and descendants
+    with min_levels_of_separation = 1, plus 'Is a' relationships if `is_a_relationships` is True.
+    Siblings are all descendants of a concept's parents, as in siblings_for_concept_id.
+
+    Every lookup accepts a single concept_id or an iterable of concept_ids.  For an iterable the result has an
+    additional first column 'concept_id' holding the input concept_id, as in the batched SQL queries.
+
+    Examples
+    --------
+    >>> from inspectomop.vocabulary import VocabularyGraph
+    >>> graph = VocabularyGraph(inspector)
+    >>> graph.descendants(192671)['descendant_concept_id']
+    >>> graph.descendants([192671, 201826])
+    """
+
+    def __init__(self, inspector, is_a_relationships=True, concept_details=False):
+        ca = inspector.tables['concept_ancestor']
+        with inspector.connect() as connection:
+            ancestry = connection.execute(_select(ca.ancestor_concept_id, ca.descendant_concept_id,
+                ca.min_levels_of_separation, ca.max_levels_of_separation)).as_numpy()
+            if is_a_relationships:
+                cr = inspector.tables['concept_relationship']
+                is_a = connection.execute(_select(cr.concept_id_1, cr.concept_id_2).where(_and_(
+                    cr.relationship_id == 'Is a', cr.invalid_reason.is_(None)))).as_numpy()
+                child_ids, parent_ids = _np.asarray(is_a['concept_id_1'], dtype=_np.int64), \
+                    _np.asarray(is_a['concept_id_2'], dtype=_np.int64)
+            else:
+                child_ids = parent_ids = _np.empty(0, dtype=_np.int64)
+            details = self._load_details(inspector, connection) if concept_details else None
+
+        ancestor_ids = _np.asarray(ancestry['ancestor_concept_id'], dtype=_np.int64)
+        descendant_ids = _np.asarray(ancestry['descendant_concept_id'], dtype=_np.int64)
+        min_separation = _np.asarray(ancestry['min_levels_of_separation'], dtype=_np.int32)
+        max_separation = _np.asarray(ancestry['max_levels_of_separation'], dtype=_np.int32)
+        self.__concept_ids = _np.unique(_np.concatenate([ancestor_ids, descendant_ids, child_ids, parent_ids]))
+        n_nodes = len(self.__concept_ids)
+        ancestors, descendants = self._index(ancestor_ids), self._index(descendant_ids)
+        # self rows (level of separation 0) are kept for siblings and skipped by ancestors/descendants
+        self.__up = _CSR(descendants, ancestors, n_nodes, min_separation, max_separation)
+        self.__down = _CSR(ancestors, descendants, n_nodes, min_separation, max_separation)
+
+        direct = min_separation == 1
+        edges = _np.unique(_np.stack([_np.concatenate([descendants[direct], self._index(child_ids)]),
+                                      _np.concatenate([ancestors[direct], self._index(parent_ids)])]), axis=1)
+        self.__parents = _CSR(edges[0], edges[1], n_nodes)
+        self.__children = _CSR(edges[1], edges[0], n_nodes)
+
+        self.__details = None
+        if details is not None:
+            # align the concept details with the graph's node order, concepts missing from the concept table are None
+            positions = _np.searchsorted(details['concept_id'], self.__concept_ids)
+            positions = _np.minimum(positions, max(len(details['concept_id']) - 1, 0))
+            found = details['concept_id'][positions] == self.__concept_ids if len(details['concept_id']) else \
+                _np.zeros(n_nodes, dtype=bool)
+            self.__details = {}
+            for attribute in _DETAIL_ATTRIBUTES:
+                values = _np.full(n_nodes, None, dtype=object)
+                values[found] = details[attribute][positions[found]]
+                self.__details[attribute] = values
+
+    def _load_details(self, inspector, connection):
+        c, v = inspector.tables['concept'], inspector.tables['vocabulary']
+        statement = _select(c.concept_id, c.concept_name, c.concept_code, c.concept_class_id, c.vocabulary_id,
+            v.vocabulary_name).where(c.vocabulary_id == v.vocabulary_id).order_by(c.concept_id)
+        details = connection.execute(statement).as_numpy()
+        details['concept_id'] = _np.asarray(details['concept_id'], dtype=_np.int64)
+        return details
+
+    def _index(self, concept_ids):
+        return _np.searchsorted(self.__concept_ids, concept_ids)
+
+    def _lookup(self, concept_ids):
+        # node indices of the concept_ids that are in the graph and the input concept_id of each
+        single = isinstance(concept_ids, _Integral)
+        if single or isinstance(concept_ids, (_np.ndarray, list, tuple)):
+            ids = _np.atleast_1d(_np.asarray(concept_ids, dtype=_np.int64))
+        else:
+            # sets, generators and other iterables
+            ids = _np.fromiter(concept_ids, dtype=_np.int64)
+        nodes = _np.minimum(self._index(ids), max(len(self.__concept_ids) - 1, 0))
+        found = self.__concept_ids[nodes] == ids if len(self.__concept_ids) else _np.zeros(len(ids), dtype=bool)
+        return single, ids[found], nodes[found]
+
+    @property
+    def concept_ids(self):
+        """
+        Sorted array of all concept_ids in the graph.
+        """
+        return self.__concept_ids
+
+    def __len__(self):
+        return len(self.__concept_ids)
+
+    def __contains__(self, concept_id):
+        index = self._index(concept_id)
+        return bool(index < len(self.__concept_ids) and self.__concept_ids[index] == concept_id)
+
+    def _result(self, lookup, single, inputs, concepts, parents=None, min_separation=None, max_separation=None,
+                return_columns=None):
+        columns = _COLUMNS[lookup]
+        if return_columns:
+            columns = [column for column in columns if column[0] in return_columns]
+        elif self.__details is None:
+            columns = [column for column in columns if column[2] not in _DETAIL_ATTRIBUTES]
+        if self.__details is None and any(attribute in _DETAIL_ATTRIBUTES for _, _, attribute in columns):
+            raise ValueError('Concept names, codes, classes and vocabularies require VocabularyGraph(..., concept_details=True)')
+
+        arrays = [] if single else [('concept_id', inputs)]
+        for name, source, attribute in columns:
+            if source == 'min':
+                arrays.append((name, min_separation))
+            elif source == 'max':
+                arrays.append((name, max_separation))
+            else:
+                nodes = concepts if source == 'concept' else parents
+                if attribute == 'concept_id':
+                    arrays.append((name, self.__concept_ids[nodes]))
+                else:
+                    arrays.append((name, self.__details[attribute][nodes]))
+        result = _np.empty(len(concepts), dtype=[(name, values.dtype) for name, values in arrays])
+        for name, values in arrays:
+            result[name] = values
+        return result
+
+    def _hierarchy(self, lookup, csr, concept_ids, return_columns):
+        single, ids, nodes = self._lookup(concept_ids)
+        positions, owners = csr.gather(nodes)
+        related = csr.indices[positions]
+        keep = related != nodes[owners] # skip the self rows
+        positions, owners, related = positions[keep], owners[keep], related[keep]
+        return self._result(lookup, single, ids[owners], related, min_separation=csr.data[0][positions],
+            max_separation=csr.data[1][positions], return_columns=return_columns)
+
+    def _neighbours(self, lookup, csr, concept_ids, return_columns):
+        single, ids, nodes = self._lookup(concept_ids)
+        positions, owners = csr.gather(nodes)
+        return self._result(lookup, single, ids[owners], csr.indices[positions], return_columns=return_columns)
+
+    def ancestors(self, concept_ids, return_columns=None):
+        """
+        Find all ancestor concepts of one or more concept_ids.
+
+        Parameters
+        ----------
+        concept_ids : int or iterable of int
+        return_columns : list of str, optional
+            - optional subset of columns to return
+            - columns : ['ancestor_concept_id', 'ancestor_concept_name', 'ancestor_concept_code', 'ancestor_concept_class_id', 'vocabulary_id', 'vocabulary_name', 'min_levels_of_separation', 'max_levels_of_separation']
+
+        Returns
+        -------
+        results : numpy structured array
+
+        See Also
+        --------
+        inspectomop.queries.general.ancestors_for_concept_id
+        """
+        return self._hierarchy('ancestors', self.__up, concept_ids, return_columns)
+
+    def descendants(self, concept_ids, return_columns=None):
+        """
+        Find all descendant concepts of one or more concept_ids.
+
+        Parameters
+        ----------
+        concept_ids : int or iterable of int
+        return_columns : list of str, optional
+            - optional subset of columns to return
+            - columns : ['descendant_concept_id', 'descendant_concept_name', 'descendant_concept_code', 'descendant_concept_class_id', 'vocabulary_id', 'vocabulary_name', 'min_levels_of_separation', 'max_levels_of_separation']
+
+        Returns
+        -------
+        results : numpy structured array
+
+        See Also
+        --------
+        inspectomop.queries.general.descendants_for_concept_id
+        """
+        return self._hierarchy('descendants', self.__down, concept_ids, return_columns)
+
+    def parents(self, concept_ids, return_columns=None):
+        """
+        Find all parent concepts of one or more concept_ids.
+
+        Parameters
+        ----------
+        concept_ids : int or iterable of int
+        return_columns : list of str, optional
+            - optional subset of columns to return
+            - columns : ['parent_concept_id', 'parent_concept_name', 'parent_concept_code', 'parent_concept_class_id', 'parent_concept_vocabulary_id', 'parent_concept_vocab_name']
+
+        Returns
+        -------
+        results : numpy structured array
+
+        See Also
+        --------
+        inspectomop.queries.general.parents_for_concept_id
+        """
+        return self._neighbours('parents', self.__parents, concept_ids, return_columns)
+
+    def children(self, concept_ids, return_columns=None):
+        """
+        Find all child concepts of one or more concept_ids.
+
+        Parameters
+        ----------
+        concept_ids : int or iterable of int
+        return_columns : list of str, optional
+            - optional subset of columns to return
+            - columns : ['child_concept_id', 'child_concept_name', 'child_concept_code', 'child_concept_class_id', 'child_concept_vocabulary_id', 'child_concept_vocab_name']
+
+        Returns
+        -------
+        results : numpy structured array
+
+        See Also
+        --------
+        inspectomop.queries.general.children_for_concept_id
+        """
+        return self._neighbours('children', self.__children, concept_ids, return_columns)
+
+    def siblings(self, concept_ids, return_columns=None):
+        """
+        Find all sibling concepts of one or more concept_ids i.e. all descendants of their parents.
+
+        Parameters
+        ----------
+        concept_ids : int or iterable of int
+        return_columns : list of str, optional
+            - optional subset of columns to return
+            - columns : ['sibling_concept_id', 'sibling_concept_name', 'sibling_concept_code', 'sibling_concept_class_id', 'sibling_concept_vocabulary_id', 'parent_concept_id', 'parent_concept_name']
+
+        Returns
+        -------
+        results : numpy structured array
+
+        See Also
+        --------
+        inspectomop.queries.general.siblings_for_concept_id
+        """
+        single, ids, nodes = self._lookup(concept_ids)
+        positions, owners = self.__parents.gather(nodes)
+        parents = self.__parents.indices[positions]
+        sibling_positions, parent_owners = self.__down.gather(parents)
+        return self._result('siblings', single, ids[owners[parent_owners]], self.__down.indices[sibling_positions],
+            parents=parents[parent_owners], return_columns=return_columns)
+
+    def separation(self, ancestor_concept_id, descendant_concept_id):
+        """
+        Returns the (min_levels_of_separation, max_levels_of_separation) between two concepts.
+
+        Parameters
+        ----------
+        ancestor_concept_id : int
+        descendant_concept_id : int
+
+        Returns
+        -------
+        separation : tuple of int or None
+            None if `descendant_concept_id` is not a descendant of `ancestor_concept_id`
+        """
+        if ancestor_concept_id not in self or descendant_concept_id not in self:
+            return None
+        ancestor, descendant = self._index(ancestor_concept_id), self._index(descendant_concept_id)
+        start, end = self.__down.indptr[ancestor], self.__down.indptr[ancestor + 1]
+        # the neighbours of each node are sorted, so the descendant is found with a binary search
+        position = start + _np.searchsorted(self.__down.indices[start:end], descendant)
+        if position == end or self.__down.indices[position] != descendant:
+            return None
+        return int(self.__down.data[0][position]), int(self.__down.data[1][position])